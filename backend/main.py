@@ -6,10 +6,98 @@ from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from config.settings import settings
 from backend.services.stock_data import stock_data_service
+from backend.services.chart_data import build_chart_data, downsample_indices
+from backend.services.upstream import UpstreamError
+from backend.services.backtest_store import backtest_store
+from backend.services.shared_cache import shared_cache
 from strategies.strategy_manager import strategy_manager
+from strategies.monte_carlo import run_monte_carlo, MAX_PATH_BARS
+from strategies.event_engine import EventEngine, SignalOrderStrategy
 from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any
+from pydantic import BaseModel
+import numpy as np
 import pandas as pd
 
+class StrategyConfig(BaseModel):
+    strategy_id: Optional[str] = None
+    spec: Optional[Any] = None  # Composite strategy spec (dict or JSON/YAML text) instead of strategy_id
+    parameters: Dict[str, Any] = {}
+    label: Optional[str] = None
+
+    def to_config(self) -> Dict[str, Any]:
+        if not self.strategy_id and not self.spec:
+            raise ValueError("Each strategy needs a strategy_id or a spec")
+        return {"strategy_id": self.strategy_id, "spec": self.spec, "parameters": self.parameters, "label": self.label}
+
+class CompareRequest(BaseModel):
+    symbol: str
+    start_date: str
+    end_date: str
+    initial_capital: float = 10000
+    strategies: Optional[List[StrategyConfig]] = None  # Defaults to every built-in strategy
+    max_points: Optional[int] = None
+    downsample: str = "lttb"
+
+class CompositeBacktestRequest(BaseModel):
+    symbol: str
+    start_date: str
+    end_date: str
+    initial_capital: float = 10000
+    spec: Any  # Dict or JSON/YAML text with 'buy' and 'sell' rules
+    parameters: Dict[str, Any] = {}
+    max_points: Optional[int] = None
+    downsample: str = "lttb"
+    save: bool = False
+
+class SweepRequest(BaseModel):
+    symbol: str
+    start_date: str
+    end_date: str
+    initial_capital: float = 10000
+    strategy: StrategyConfig
+    grid: Dict[str, List[Any]]
+
+class RobustnessRequest(BaseModel):
+    symbol: str
+    start_date: str
+    end_date: str
+    initial_capital: float = 10000
+    strategy: StrategyConfig
+    method: str = "bootstrap"  # 'bootstrap' or 'gbm'
+    n_paths: int = 1000
+    n_bars: Optional[int] = None
+    block_size: int = 20
+    seed: int = 0
+
+class OrderBacktestRequest(BaseModel):
+    symbol: str
+    start_date: str
+    end_date: str
+    initial_capital: float = 10000
+    strategy: StrategyConfig
+    entry: str = "market_on_close"  # 'market_on_close', 'market' (next open) or 'limit'
+    limit_offset: float = 0.0  # Limit entries this fraction below the signal close
+    stop_loss: Optional[float] = None  # Fractions of the entry / highest price
+    take_profit: Optional[float] = None
+    trailing_stop: Optional[float] = None
+    commission: float = 0.0
+    slippage: float = 0.0
+    max_points: Optional[int] = None
+    downsample: str = "lttb"
+
+# Upper bounds on synthetic paths, and on paths x bars, per robustness request
+MAX_ROBUSTNESS_PATHS = 20000
+MAX_ROBUSTNESS_PATH_BARS = 100_000_000
+
+def error_status(error: Exception) -> int:
+    """HTTP status for a failed request: 503 when market data is unavailable, else 400"""
+    return 503 if isinstance(error, UpstreamError) else 400
+
+# Endpoints that fetch data or run backtests are plain functions: FastAPI runs
+# them in its threadpool, so a request waiting on the rate limiter, a retry
+# backoff or another worker's cache fill never blocks the event loop (and
+# with it /health and every other request on this worker)
 app = FastAPI(title="QuantDash API", version="1.0.0")
 
 app.add_middleware(
@@ -29,16 +117,16 @@ async def health_check():
     return {"status": "healthy"}
 
 @app.get("/stock/{symbol}")
-async def get_stock_info(symbol: str):
+def get_stock_info(symbol: str):
     """Get basic information about a stock"""
     try:
         info = stock_data_service.get_stock_info(symbol.upper())
         return {"success": True, "data": info}
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise HTTPException(status_code=error_status(e), detail=str(e))
 
 @app.get("/stock/{symbol}/data")
-async def get_stock_data(symbol: str, start_date: str, end_date: str):
+def get_stock_data(symbol: str, start_date: str, end_date: str):
     """Get historical stock data"""
     try:
         data = stock_data_service.get_stock_data(symbol.upper(), start_date, end_date)
@@ -53,40 +141,73 @@ async def get_stock_data(symbol: str, start_date: str, end_date: str):
         
         return {"success": True, "data": data_dict}
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise HTTPException(status_code=error_status(e), detail=str(e))
+
+@app.get("/stocks/data")
+def get_bulk_stock_data(symbols: str, start_date: str, end_date: str):
+    """Get historical stock data for several comma-separated symbols in one upstream request"""
+    try:
+        symbol_list = [s.strip().upper() for s in symbols.split(",") if s.strip()]
+        if not symbol_list:
+            raise ValueError("At least one symbol is required")
+        data = stock_data_service.get_bulk_stock_data(symbol_list, start_date, end_date)
+
+        return {"success": True, "data": {
+            symbol: {
+                "symbol": symbol,
+                "start_date": start_date,
+                "end_date": end_date,
+                "data": frame.reset_index().to_dict(orient="records")
+            }
+            for symbol, frame in data.items()
+        }}
+    except Exception as e:
+        raise HTTPException(status_code=error_status(e), detail=str(e))
 
 @app.get("/stock/{symbol}/price")
-async def get_live_price(symbol: str):
+def get_live_price(symbol: str):
     """Get current live price for a stock"""
     try:
         price = stock_data_service.get_live_price(symbol.upper())
         return {"success": True, "symbol": symbol.upper(), "price": price}
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise HTTPException(status_code=error_status(e), detail=str(e))
 
 @app.get("/strategies")
-async def get_strategies():
+def get_strategies():
     """Get all available trading strategies"""
     try:
         strategies = strategy_manager.get_available_strategies()
         return {"success": True, "strategies": strategies}
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise HTTPException(status_code=error_status(e), detail=str(e))
 
 @app.get("/backtest")
-async def run_backtest(
+def run_backtest(
     symbol: str,
     strategy_id: str,
     start_date: str,
     end_date: str,
     initial_capital: float = 10000,
+    max_points: Optional[int] = None,
+    downsample: str = "lttb",
+    summary_only: bool = False,
+    save: bool = False,
     request: Request = None
 ):
+    """
+    Run a backtest and return its metrics together with chart-ready series
+
+    Pass max_points to downsample the price/equity/drawdown series server-side,
+    or summary_only=true to get just the metrics and trade log. With save=true
+    the run is stored with a checkpoint and its backtest_id can be extended
+    later through /backtests/{backtest_id}/extend.
+    """
     try:
         # Get all query params as a dict
         params = dict(request.query_params)
         # Remove known params so only strategy params remain
-        for key in ["symbol", "strategy_id", "start_date", "end_date", "initial_capital"]:
+        for key in ["symbol", "strategy_id", "start_date", "end_date", "initial_capital", "max_points", "downsample", "summary_only", "save"]:
             params.pop(key, None)
         # Convert numeric params to int/float as needed
         for k, v in params.items():
@@ -98,10 +219,161 @@ async def run_backtest(
             except ValueError:
                 pass  # keep as string if not numeric
 
-        # Get historical data
-        data = stock_data_service.get_stock_data(symbol.upper(), start_date, end_date)
-        # Run backtest
-        results = strategy_manager.run_backtest(strategy_id, data, initial_capital, **params)
+        def compute():
+            # Get historical data
+            data = stock_data_service.get_stock_data(symbol.upper(), start_date, end_date)
+            # Run backtest
+            report = strategy_manager.run_backtest(strategy_id, data, initial_capital, not summary_only, **params)
+            results = report.to_dict()
+            if not summary_only:
+                results['chart'] = build_chart_data(data, report, max_points, downsample)
+            return report, results
+
+        if save:
+            report, results = compute()
+            config = {"strategy_id": strategy_id, "parameters": params}
+            results['backtest_id'] = backtest_store.save(symbol.upper(), start_date, config, report)
+        elif settings.BACKTEST_CACHE_TTL:
+            # Identical requests are answered once across all workers
+            key = ('backtest', symbol.upper(), strategy_id, start_date, end_date, initial_capital,
+                   sorted(params.items()), max_points, downsample, summary_only)
+            results = shared_cache.get_or_fill(key, lambda: compute()[1], settings.BACKTEST_CACHE_TTL)
+        else:
+            results = compute()[1]
+        return {"success": True, "results": results}
+    except Exception as e:
+        raise HTTPException(status_code=error_status(e), detail=str(e))
+
+@app.post("/compare")
+def compare_strategies(compare: CompareRequest):
+    """
+    Backtest several strategies on one data fetch and return aligned equity curves
+    and a metrics table
+    """
+    try:
+        if compare.strategies:
+            configs = [config.to_config() for config in compare.strategies]
+        else:
+            configs = [{"strategy_id": s["id"], "parameters": {}} for s in strategy_manager.get_available_strategies()]
+
+        # Get historical data once for every strategy
+        data = stock_data_service.get_stock_data(compare.symbol.upper(), compare.start_date, compare.end_date)
+        comparison = strategy_manager.compare_strategies(configs, data, compare.initial_capital)
+
+        # Downsample all equity curves on one shared index set so they stay aligned
+        curves = comparison["equity"]
+        indices = np.arange(len(comparison["dates"]))
+        if compare.max_points:
+            indices = downsample_indices(curves, compare.max_points, compare.downsample)
+        comparison["dates"] = [comparison["dates"][i] for i in indices]
+        comparison["equity"] = {label: values[indices].tolist() for label, values in curves.items()}
+
+        return {"success": True, "symbol": compare.symbol.upper(), "results": comparison}
+    except Exception as e:
+        raise HTTPException(status_code=error_status(e), detail=str(e))
+
+@app.post("/backtest/composite")
+def run_composite_backtest(backtest: CompositeBacktestRequest):
+    """Run a backtest for a composite strategy described by declarative buy/sell rules"""
+    try:
+        # Compile the rules before fetching data so bad specs fail fast
+        _, strategy = strategy_manager.strategy_from_config({"spec": backtest.spec, "parameters": backtest.parameters})
+        data = stock_data_service.get_stock_data(backtest.symbol.upper(), backtest.start_date, backtest.end_date)
+        report = strategy.backtest(data, backtest.initial_capital)
+        results = report.to_dict()
+        results['chart'] = build_chart_data(data, report, backtest.max_points, backtest.downsample)
+        if backtest.save:
+            config = {"spec": backtest.spec, "parameters": backtest.parameters}
+            results['backtest_id'] = backtest_store.save(backtest.symbol.upper(), backtest.start_date, config, report)
         return {"success": True, "results": results}
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=error_status(e), detail=str(e))
+
+@app.post("/backtest/orders")
+def run_order_backtest(backtest: OrderBacktestRequest):
+    """
+    Run a built-in or composite strategy through the event-driven order engine
+
+    Signals place real orders that fill within each bar's High/Low, with
+    optional stop-loss, take-profit and trailing-stop exits.
+    """
+    try:
+        _, strategy = strategy_manager.strategy_from_config(backtest.strategy.to_config())
+        orders = SignalOrderStrategy(
+            strategy,
+            entry=backtest.entry,
+            limit_offset=backtest.limit_offset,
+            stop_loss=backtest.stop_loss,
+            take_profit=backtest.take_profit,
+            trailing_stop=backtest.trailing_stop
+        )
+        data = stock_data_service.get_stock_data(backtest.symbol.upper(), backtest.start_date, backtest.end_date)
+        engine = EventEngine(data, backtest.initial_capital, backtest.commission, backtest.slippage)
+        result = engine.run(orders)
+        results = result.to_dict()
+        results['chart'] = build_chart_data(data, result.to_report(), backtest.max_points, backtest.downsample)
+        return {"success": True, "results": results}
+    except Exception as e:
+        raise HTTPException(status_code=error_status(e), detail=str(e))
+
+@app.get("/backtests/{backtest_id}")
+def get_saved_backtest(backtest_id: int):
+    """Get a saved backtest"""
+    try:
+        return {"success": True, "results": backtest_store.get(backtest_id)}
+    except Exception as e:
+        raise HTTPException(status_code=error_status(e), detail=str(e))
+
+@app.post("/backtests/{backtest_id}/extend")
+def extend_saved_backtest(backtest_id: int, end_date: Optional[str] = None):
+    """
+    Extend a saved backtest with the bars that arrived since it last ran
+
+    Only the new bars are fetched and processed, continuing from the stored
+    checkpoint; the metrics match a full rerun over the whole period.
+    """
+    try:
+        return {"success": True, "results": backtest_store.extend(backtest_id, end_date)}
+    except Exception as e:
+        raise HTTPException(status_code=error_status(e), detail=str(e))
+
+@app.post("/sweep")
+def sweep_strategy(sweep: SweepRequest):
+    """Backtest every combination of a parameter grid for a built-in or composite strategy"""
+    try:
+        config = sweep.strategy.to_config()
+        data = stock_data_service.get_stock_data(sweep.symbol.upper(), sweep.start_date, sweep.end_date)
+        metrics = strategy_manager.sweep_strategy(config, sweep.grid, data, sweep.initial_capital)
+        return {"success": True, "symbol": sweep.symbol.upper(), "results": metrics}
+    except Exception as e:
+        raise HTTPException(status_code=error_status(e), detail=str(e))
+
+@app.post("/robustness")
+def run_robustness(robustness: RobustnessRequest):
+    """
+    Run a strategy over block-bootstrapped or GBM price paths fitted to the
+    historical data and return the distribution of its metrics
+    """
+    try:
+        if robustness.n_paths > MAX_ROBUSTNESS_PATHS:
+            raise ValueError(f"n_paths is limited to {MAX_ROBUSTNESS_PATHS}")
+        if robustness.n_bars and robustness.n_bars > MAX_PATH_BARS:
+            raise ValueError(f"n_bars is limited to {MAX_PATH_BARS}")
+        _, strategy = strategy_manager.strategy_from_config(robustness.strategy.to_config())
+        data = stock_data_service.get_stock_data(robustness.symbol.upper(), robustness.start_date, robustness.end_date)
+        if robustness.n_paths * (robustness.n_bars or len(data)) > MAX_ROBUSTNESS_PATH_BARS:
+            raise ValueError(f"n_paths x n_bars is limited to {MAX_ROBUSTNESS_PATH_BARS:,}")
+        results = run_monte_carlo(
+            strategy, data,
+            n_paths=robustness.n_paths,
+            method=robustness.method,
+            n_bars=robustness.n_bars,
+            block_size=robustness.block_size,
+            initial_capital=robustness.initial_capital,
+            seed=robustness.seed,
+            # Workers share the machine, so each gets its share of the cores
+            n_jobs=max(1, (os.cpu_count() or 1) // max(1, settings.API_WORKERS))
+        )
+        return {"success": True, "symbol": robustness.symbol.upper(), "results": results}
+    except Exception as e:
+        raise HTTPException(status_code=error_status(e), detail=str(e))
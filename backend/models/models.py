@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey
 from sqlalchemy.sql import func
 from .base import Base
 
@@ -25,4 +25,18 @@ class Strategy(Base):
     description = Column(Text)
     parameters = Column(Text)  # JSON string of strategy parameters
     is_active = Column(Integer, default=1)
-    created_at = Column(DateTime, default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime, default=func.now())
+
+class BacktestCheckpoint(Base):
+    __tablename__ = "backtest_checkpoints"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    backtest_id = Column(Integer, ForeignKey("backtest_results.id"), unique=True, index=True)
+    strategy_config = Column(Text)  # JSON string of {'strategy_id' or 'spec', 'parameters'}
+    state = Column(Text)  # JSON string of the BacktestState after the last bar
+    n_bars = Column(Integer)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    # Updates only apply if n_bars is unchanged since the row was read, so two
+    # concurrent extensions of one backtest cannot both move the checkpoint
+    __mapper_args__ = {"version_id_col": n_bars, "version_id_generator": False}
@@ -0,0 +1,175 @@
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from sqlalchemy.orm.exc import StaleDataError
+from backend.models.base import Base, SessionLocal, engine
+from backend.models.models import BacktestResult, BacktestCheckpoint
+from backend.services.stock_data import stock_data_service
+from strategies.base.results import BacktestReport
+from strategies.base.state import BacktestState
+from strategies.strategy_manager import strategy_manager
+
+
+class BacktestStore:
+    """
+    Saves backtests together with their checkpoint and extends them when new
+    bars arrive
+
+    Each saved run is a ``BacktestResult`` row (metrics and trade log) plus a
+    ``BacktestCheckpoint`` row holding the strategy config and the
+    ``BacktestState`` after its last bar. Extending a run only fetches and
+    processes the bars after that checkpoint.
+    """
+
+    def __init__(self, session_factory=SessionLocal, data_service=None):
+        self.session_factory = session_factory
+        self.data_service = data_service or stock_data_service
+        self._tables_ready = False
+        self._lock = threading.Lock()
+
+    def _session(self):
+        # Create missing tables on first use, so databases set up before
+        # checkpoints existed pick up the new table
+        with self._lock:
+            if not self._tables_ready:
+                Base.metadata.create_all(bind=engine)
+                self._tables_ready = True
+        return self.session_factory()
+
+    def save(self, symbol: str, start_date: str, config: Dict[str, Any], report: BacktestReport) -> int:
+        """
+        Store a backtest and its checkpoint
+
+        Args:
+            symbol: Stock symbol the backtest ran on
+            start_date: Start date in 'YYYY-MM-DD' format
+            config: {'strategy_id' or 'spec', 'parameters'} the strategy was built from
+            report: Report from BaseStrategy.backtest
+
+        Returns:
+            ID of the stored backtest
+        """
+        config = {key: config.get(key) for key in ('strategy_id', 'spec', 'parameters')}
+        db = self._session()
+        try:
+            result = BacktestResult(
+                strategy_name=report.strategy_name,
+                symbol=symbol,
+                start_date=datetime.strptime(start_date, '%Y-%m-%d')
+            )
+            checkpoint = BacktestCheckpoint(strategy_config=json.dumps(config))
+            self._update(result, checkpoint, report, report.trade_records())
+            db.add(result)
+            db.flush()
+            checkpoint.backtest_id = result.id
+            db.add(checkpoint)
+            db.commit()
+            return result.id
+        finally:
+            db.close()
+
+    def get(self, backtest_id: int) -> Dict[str, Any]:
+        """
+        Get a stored backtest
+
+        Args:
+            backtest_id: ID returned by ``save``
+
+        Returns:
+            Dictionary with the run's symbol, dates, strategy config and results
+        """
+        db = self._session()
+        try:
+            result, checkpoint = self._load(db, backtest_id)
+            return self._describe(result, checkpoint)
+        finally:
+            db.close()
+
+    def extend(self, backtest_id: int, end_date: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Bring a stored backtest up to date with bars after its checkpoint
+
+        Strategies that cannot be extended incrementally (e.g. composites using
+        EMAs) are rerun over the full date range instead, as are runs whose
+        history was adjusted for a dividend or split since the checkpoint.
+
+        Args:
+            backtest_id: ID returned by ``save``
+            end_date: End date in 'YYYY-MM-DD' format (exclusive, defaults to tomorrow)
+
+        Returns:
+            Dictionary like ``get`` plus the number of new bars processed
+        """
+        end_date = end_date or (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+        db = self._session()
+        try:
+            result, checkpoint = self._load(db, backtest_id)
+            _, strategy = strategy_manager.strategy_from_config(json.loads(checkpoint.strategy_config))
+            state = BacktestState.from_json(checkpoint.state)
+
+            report = None
+            if strategy.can_extend(state):
+                # Fetch from the checkpoint's own bar so the request is never empty,
+                # and so a dividend or split that rescaled the history shows up there
+                new_data = self.data_service.get_stock_data(
+                    result.symbol, state.last_date.strftime('%Y-%m-%d'), end_date
+                )
+                if state.matches(new_data):
+                    report = strategy.extend_backtest(state, new_data, include_series=False)
+                    trades = json.loads(result.results_data)['trades'] + report.trade_records()
+            if report is None:
+                data = self.data_service.get_stock_data(
+                    result.symbol, result.start_date.strftime('%Y-%m-%d'), end_date
+                )
+                report = strategy.backtest(data, state.initial_capital, include_series=False)
+                trades = report.trade_records()
+
+            new_bars = report.state.n_bars - state.n_bars
+            # A rerun over adjusted prices is saved even without new bars
+            if new_bars or report.state.last_close != state.last_close:
+                self._update(result, checkpoint, report, trades)
+                try:
+                    db.commit()
+                except StaleDataError:
+                    db.rollback()
+                    raise ValueError(f"Backtest {backtest_id} was extended concurrently; try again")
+            return {**self._describe(result, checkpoint), 'new_bars': new_bars}
+        finally:
+            db.close()
+
+    @staticmethod
+    def _load(db, backtest_id: int):
+        result = db.query(BacktestResult).filter(BacktestResult.id == backtest_id).first()
+        checkpoint = db.query(BacktestCheckpoint).filter(BacktestCheckpoint.backtest_id == backtest_id).first()
+        if result is None or checkpoint is None:
+            raise ValueError(f"Backtest {backtest_id} not found")
+        return result, checkpoint
+
+    @staticmethod
+    def _update(result: BacktestResult, checkpoint: BacktestCheckpoint, report: BacktestReport, trades):
+        summary = report.summary()
+        result.end_date = report.state.last_date.tz_localize(None).to_pydatetime()
+        result.total_return = summary['total_return']
+        result.win_rate = summary['win_rate']
+        result.max_drawdown = summary['max_drawdown']
+        result.sharpe_ratio = summary['sharpe_ratio']
+        result.results_data = json.dumps({'strategy_name': report.strategy_name, **summary, 'trades': trades})
+        checkpoint.state = report.state.to_json()
+        checkpoint.n_bars = report.state.n_bars
+
+    @staticmethod
+    def _describe(result: BacktestResult, checkpoint: BacktestCheckpoint) -> Dict[str, Any]:
+        return {
+            'backtest_id': result.id,
+            'symbol': result.symbol,
+            'start_date': result.start_date.strftime('%Y-%m-%d'),
+            'end_date': result.end_date.strftime('%Y-%m-%d'),
+            'strategy': json.loads(checkpoint.strategy_config),
+            'n_bars': checkpoint.n_bars,
+            'results': json.loads(result.results_data)
+        }
+
+
+# Create a global instance
+backtest_store = BacktestStore()
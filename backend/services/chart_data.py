@@ -0,0 +1,179 @@
+import math
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, Optional
+from strategies.base.results import BacktestReport, format_dates, is_daily
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+
+def lttb_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling over an evenly spaced x axis
+
+    Args:
+        y: Series values
+        n_out: Number of points to keep (including the first and last point)
+
+    Returns:
+        Sorted array of selected indices
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Buckets hold a handful of points each, so plain Python beats per-bucket NumPy calls
+    values = np.asarray(y, dtype=float).tolist()
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int).tolist()
+
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    prev = 0
+
+    for b in range(n_out - 2):
+        start, end = edges[b], edges[b + 1]
+        # Average of the next bucket (or the last point) is the third triangle vertex
+        if b + 2 < len(edges):
+            next_start, next_end = edges[b + 1], edges[b + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = (next_start + next_end - 1) / 2
+        if next_end > next_start:
+            finite = [v for v in values[next_start:next_end] if v == v]
+            avg_y = sum(finite) / len(finite) if finite else math.nan
+        else:
+            avg_y = values[-1]
+
+        # Keep the point forming the largest triangle with the previous pick (NaN areas never win)
+        prev_x, prev_y = prev, values[prev]
+        best, best_area = start, -1.0
+        for i in range(start, end):
+            area = abs((prev_x - avg_x) * (values[i] - prev_y) - (prev_x - i) * (avg_y - prev_y))
+            if area > best_area:
+                best, best_area = i, area
+        prev = best
+        selected[b + 1] = prev
+
+    return selected
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Min/max downsampling: keep the lowest and highest point of every bucket
+
+    Args:
+        y: Series values
+        n_out: Number of points to keep (including the first and last point)
+
+    Returns:
+        Sorted array of selected indices
+    """
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=float)
+    n_buckets = (n_out - 2) // 2
+    edges = np.linspace(1, n - 1, n_buckets + 1).astype(int)
+    filled = np.where(np.isnan(y), np.nanmean(y), y)
+
+    selected = [0, n - 1]
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        bucket = filled[start:end]
+        selected.append(start + int(bucket.argmin()))
+        selected.append(start + int(bucket.argmax()))
+
+    return np.unique(selected)
+
+
+def downsample_indices(series: Dict[str, np.ndarray], max_points: int, method: str = "lttb") -> np.ndarray:
+    """
+    Pick a shared set of indices so that several aligned series stay aligned
+
+    The point budget is split evenly between the series and the per-series
+    selections are merged, so the result never exceeds ``max_points``.
+
+    Args:
+        series: Mapping of series name to values (all the same length)
+        max_points: Maximum number of points to keep
+        method: 'lttb' or 'minmax'
+
+    Returns:
+        Sorted array of selected indices
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsample method '{method}', expected one of {DOWNSAMPLE_METHODS}")
+
+    n = len(next(iter(series.values())))
+    if max_points >= n:
+        return np.arange(n)
+
+    select = lttb_indices if method == "lttb" else minmax_indices
+    budget = max(max_points // len(series), 4)
+    indices = np.unique(np.concatenate([select(values, budget) for values in series.values()]))
+
+    # Rounding can push the union slightly over budget; thin it evenly, keeping both ends
+    if len(indices) > max_points:
+        keep = np.unique(np.linspace(0, len(indices) - 1, max_points).round().astype(int))
+        indices = indices[keep]
+
+    return indices
+
+
+def build_chart_data(
+    data: pd.DataFrame,
+    results: BacktestReport,
+    max_points: Optional[int] = None,
+    method: str = "lttb"
+) -> Dict[str, Any]:
+    """
+    Build chart-ready, index-aligned series for a backtest
+
+    Args:
+        data: DataFrame with OHLCV data used for the backtest
+        results: Backtest report from BaseStrategy.backtest (with series)
+        max_points: Optional target number of points per series
+        method: Downsampling method, 'lttb' or 'minmax'
+
+    Returns:
+        Dictionary with aligned dates, price, equity and drawdown series and
+        buy/sell trade markers
+    """
+    price = data['Close'].to_numpy(dtype=float)
+    equity = results.equity
+    running_peak = np.maximum.accumulate(equity)
+    drawdown = (equity - running_peak) / running_peak * 100
+    daily = is_daily(data.index)
+
+    total_points = len(price)
+    if max_points:
+        indices = downsample_indices(
+            {'price': price, 'equity': equity, 'drawdown': drawdown}, max_points, method
+        )
+    else:
+        indices = np.arange(total_points)
+
+    # Trade markers come straight from the trade log, so they are never dropped by downsampling
+    trades = results.trades
+    markers = {}
+    for action, name in ((1, 'buy'), (-1, 'sell')):
+        selected = trades[trades['action'] == action]
+        markers[name] = {
+            'dates': format_dates(data.index[selected['bar']], daily),
+            'prices': selected['price'].tolist()
+        }
+
+    return {
+        'dates': format_dates(data.index[indices], daily),
+        'price': price[indices].tolist(),
+        'equity': equity[indices].tolist(),
+        'drawdown': drawdown[indices].tolist(),
+        'buy': markers['buy'],
+        'sell': markers['sell'],
+        'points': len(indices),
+        'total_points': total_points,
+        'downsampled': len(indices) < total_points
+    }
@@ -0,0 +1,57 @@
+import zlib
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# Every synthetic series starts here, so any date range of a symbol is a slice of one fixed history
+OFFLINE_EPOCH = "2000-01-03"
+
+
+def synthetic_history(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+    """
+    Deterministic synthetic daily OHLCV data shaped like a yfinance history
+
+    The series is seeded from the symbol (not Python's randomized ``hash``), so
+    every process generates identical bars for the same symbol.
+
+    Args:
+        symbol: Stock symbol
+        start_date: Start date in 'YYYY-MM-DD' format
+        end_date: End date in 'YYYY-MM-DD' format (exclusive, like yfinance)
+
+    Returns:
+        DataFrame with OHLCV data
+    """
+    index = pd.bdate_range(OFFLINE_EPOCH, end_date, inclusive="left", tz="America/New_York", name="Date")
+    rng = np.random.default_rng(zlib.crc32(symbol.upper().encode()))
+    n_bars = len(index)
+
+    # One row of draws per bar, so a longer range extends a shorter one bar for bar
+    shocks = rng.standard_normal((n_bars, 4))
+    close = 50 * np.exp(np.cumsum(0.0003 + 0.015 * shocks[:, 0]))
+    open_ = close * np.exp(0.005 * shocks[:, 1])
+    high = np.maximum(open_, close) * (1 + 0.008 * np.abs(shocks[:, 2]))
+    low = np.minimum(open_, close) * (1 - 0.008 * np.abs(shocks[:, 3]))
+    volume = (1_000_000 * (1 + np.abs(shocks[:, 0] - shocks[:, 1]))).astype(np.int64)
+
+    data = pd.DataFrame({
+        "Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume,
+        "Dividends": 0.0, "Stock Splits": 0.0
+    }, index=index)
+    data = data[data.index >= pd.Timestamp(start_date, tz="America/New_York")]
+    if data.empty:
+        raise ValueError(f"No data found for {symbol} between {start_date} and {end_date}")
+    return data
+
+
+def synthetic_info(symbol: str) -> dict:
+    """Basic stock info for a synthetic symbol, priced at its latest synthetic close"""
+    today = datetime.now().strftime("%Y-%m-%d")
+    return {
+        "symbol": symbol,
+        "name": f"{symbol} (synthetic)",
+        "sector": "Unknown",
+        "industry": "Unknown",
+        "market_cap": 0,
+        "current_price": float(synthetic_history(symbol, OFFLINE_EPOCH, today)["Close"].iloc[-1])
+    }
@@ -0,0 +1,191 @@
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional
+from config.settings import settings
+
+# Returned by SharedCache.get when there is no usable entry
+MISSING = object()
+
+
+class SharedCache:
+    """
+    Key/value cache shared by every worker process through one SQLite file
+
+    Uvicorn workers are separate processes, so an in-process cache would be
+    duplicated (and filled from upstream) once per worker. Entries here live in
+    a SQLite database in WAL mode, which lets any number of processes read
+    concurrently while one writes.
+
+    ``get_or_fill`` is single-flight across processes: the first worker to
+    miss a key takes a fill lock (a row in the ``fills`` table) and computes
+    the value; the others wait for it to appear instead of computing it too.
+
+    Expired entries are kept (up to ``max_entries``, least recently written
+    dropped first) so callers can fall back to them when upstream is failing.
+    Values are pickled, so the file must only be writable by the app.
+
+    Args:
+        path: SQLite database file
+        max_entries: Maximum number of entries kept
+        lock_timeout: Seconds a fill lock is held at most; waiters stop waiting
+            and fill themselves after this long
+        poll_interval: Seconds between checks while waiting for another fill
+    """
+
+    def __init__(self, path: str, max_entries: int = 512, lock_timeout: float = 60,
+                 poll_interval: float = 0.02):
+        self.path = path
+        self.max_entries = max_entries
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and process; connections never cross a fork
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries "
+                "(key TEXT PRIMARY KEY, value BLOB, expires_at REAL, updated_at REAL)"
+            )
+            connection.execute("CREATE TABLE IF NOT EXISTS fills (key TEXT PRIMARY KEY, owner TEXT, expires_at REAL)")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    @staticmethod
+    def _key(key: Hashable) -> str:
+        return json.dumps(key, default=str)
+
+    def get(self, key: Hashable, allow_stale: bool = False) -> Any:
+        """
+        Look up a value
+
+        Args:
+            key: JSON-serializable key, e.g. ('history', 'AAPL', start, end)
+            allow_stale: Also return expired entries
+
+        Returns:
+            The cached value, or MISSING
+        """
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM entries WHERE key = ?", (self._key(key),)
+        ).fetchone()
+        if row is None or (not allow_stale and row[1] is not None and row[1] <= time.time()):
+            return MISSING
+        return pickle.loads(row[0])
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """
+        Store a value
+
+        Args:
+            key: JSON-serializable key
+            value: Picklable value
+            ttl: Seconds the entry stays fresh (None never expires)
+        """
+        now = time.time()
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO entries (key, value, expires_at, updated_at) VALUES (?, ?, ?, ?)",
+            (self._key(key), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+             None if ttl is None else now + ttl, now)
+        )
+        self._writes += 1
+        if self._writes % 32 == 0:
+            connection.execute(
+                "DELETE FROM entries WHERE key NOT IN "
+                "(SELECT key FROM entries ORDER BY updated_at DESC LIMIT ?)", (self.max_entries,)
+            )
+
+    def get_or_fill(self, key: Hashable, fill: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Return the fresh cached value for ``key``, or compute and store it
+
+        Only one process fills a given key at a time; the others wait for its
+        result. If the filling process fails, the next waiter takes over.
+
+        Args:
+            key: JSON-serializable key
+            fill: Zero-argument callable computing the value
+            ttl: Seconds the entry stays fresh; with 0 every call fills and
+                the value is only kept as a stale fallback
+
+        Returns:
+            The value
+        """
+        if ttl == 0:
+            value = fill()
+            self.set(key, value, 0)
+            return value
+        value = self.get(key)
+        if value is not MISSING:
+            self.hits += 1
+            return value
+        self.misses += 1
+
+        deadline = time.monotonic() + self.lock_timeout
+        while True:
+            if self._acquire(key):
+                try:
+                    # Another process may have filled the key while we waited
+                    value = self.get(key)
+                    if value is MISSING:
+                        value = fill()
+                        self.set(key, value, ttl)
+                    return value
+                finally:
+                    self._release(key)
+            time.sleep(self.poll_interval)
+            value = self.get(key)
+            if value is not MISSING:
+                return value
+            if time.monotonic() > deadline:
+                # The filling process is stuck; do not wait on it forever
+                return fill()
+
+    def _owner(self) -> str:
+        return f"{os.getpid()}:{threading.get_ident()}"
+
+    def _acquire(self, key: Hashable) -> bool:
+        now = time.time()
+        connection = self._connection()
+        connection.execute("DELETE FROM fills WHERE key = ? AND expires_at < ?", (self._key(key), now))
+        cursor = connection.execute(
+            "INSERT OR IGNORE INTO fills (key, owner, expires_at) VALUES (?, ?, ?)",
+            (self._key(key), self._owner(), now + self.lock_timeout)
+        )
+        return cursor.rowcount == 1
+
+    def _release(self, key: Hashable):
+        self._connection().execute(
+            "DELETE FROM fills WHERE key = ? AND owner = ?", (self._key(key), self._owner())
+        )
+
+    def stats(self) -> dict:
+        """Entry count for the shared file and hit/miss counters for this process"""
+        entries = self._connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {'entries': entries, 'hits': self.hits, 'misses': self.misses, 'pid': os.getpid()}
+
+    def clear(self):
+        """Drop every entry"""
+        connection = self._connection()
+        connection.execute("DELETE FROM entries")
+        connection.execute("DELETE FROM fills")
+
+
+# Create a global instance
+shared_cache = SharedCache(settings.SHARED_CACHE_PATH, settings.SHARED_CACHE_MAX_ENTRIES)
@@ -1,55 +1,167 @@
 import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+from config.settings import settings
+from backend.services.upstream import (
+    Upstream, UpstreamError, TokenBucket, RetryPolicy, CircuitBreaker, build_session
+)
+from backend.services.shared_cache import SharedCache, shared_cache, MISSING
+from backend.services.offline_data import synthetic_history, synthetic_info
 
 class StockDataService:
     """Service for fetching stock data from Yahoo Finance"""
-    
-    def __init__(self):
-        self.cache = {}  # Simple in-memory cache
-    
+
+    def __init__(self, upstream: Optional[Upstream] = None, cache: Optional[SharedCache] = None,
+                 offline: Optional[bool] = None):
+        # Every call shares one pooled session, rate limit, retry policy and circuit breaker.
+        # The configured rate is the total for the deployment, so each worker gets its share.
+        workers = max(1, settings.API_WORKERS)
+        self.upstream = upstream or Upstream(
+            "Yahoo Finance",
+            session=build_session(settings.UPSTREAM_POOL_SIZE),
+            rate_limiter=TokenBucket(settings.UPSTREAM_RATE_PER_SECOND / workers, max(1, settings.UPSTREAM_BURST / workers)),
+            retry=RetryPolicy(settings.UPSTREAM_MAX_ATTEMPTS, settings.UPSTREAM_BACKOFF_BASE, settings.UPSTREAM_BACKOFF_MAX),
+            breaker=CircuitBreaker(settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_RESET_SECONDS),
+            timeout=settings.UPSTREAM_TIMEOUT
+        )
+        # Shared by all worker processes; expired entries double as last good
+        # responses, served when upstream is failing
+        self.cache = cache or shared_cache
+        self.ttl = settings.STOCK_DATA_TTL
+        self.offline = settings.OFFLINE_DATA if offline is None else offline
+
+    def _cached(self, key, error: UpstreamError):
+        """Return the last good value for key, or re-raise the upstream error"""
+        value = self.cache.get(key, allow_stale=True)
+        if value is MISSING:
+            raise error
+        return value
+
+    def _ticker(self, symbol: str):
+        return yf.Ticker(symbol, session=self.upstream.session)
+
+    def _fetch_history(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        data = self._ticker(symbol).history(
+            start=start_date, end=end_date, timeout=self.upstream.timeout, raise_errors=True
+        )
+        if data.empty:
+            raise ValueError(f"No data found for {symbol} between {start_date} and {end_date}")
+        return data
+
     def get_stock_data(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
         """
         Fetch historical stock data for a given symbol and date range
-        
+
+        Responses are cached across worker processes for STOCK_DATA_TTL
+        seconds, and only one worker fetches a given range at a time. Falls
+        back to the last good response for the same request if Yahoo Finance
+        is failing or its circuit breaker is open.
+
         Args:
             symbol: Stock symbol (e.g., 'AAPL', 'MSFT')
             start_date: Start date in 'YYYY-MM-DD' format
             end_date: End date in 'YYYY-MM-DD' format
-            
+
         Returns:
             DataFrame with OHLCV data
         """
+        key = ('history', symbol, start_date, end_date)
+
+        def fetch():
+            if self.offline:
+                return synthetic_history(symbol, start_date, end_date)
+            return self.upstream.call(self._fetch_history, symbol, start_date, end_date)
+
         try:
-            # Create ticker object
-            ticker = yf.Ticker(symbol)
-            
-            # Fetch historical data
-            data = ticker.history(start=start_date, end=end_date)
-            
-            if data.empty:
-                raise ValueError(f"No data found for {symbol} between {start_date} and {end_date}")
-            
-            return data
-            
+            return self.cache.get_or_fill(key, fetch, self.ttl)
+        except UpstreamError as e:
+            return self._cached(key, e)
         except Exception as e:
             raise Exception(f"Error fetching data for {symbol}: {str(e)}")
-    
+
+    def get_bulk_stock_data(self, symbols: List[str], start_date: str, end_date: str) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch historical data for several symbols in one upstream request
+
+        Symbols already in the shared cache are served from it; only the rest
+        are downloaded.
+
+        Args:
+            symbols: Stock symbols
+            start_date: Start date in 'YYYY-MM-DD' format
+            end_date: End date in 'YYYY-MM-DD' format
+
+        Returns:
+            Dictionary of symbol to DataFrame with OHLCV data
+        """
+        keys = {symbol: ('history', symbol, start_date, end_date) for symbol in symbols}
+        # Downloaded frames are kept under their own key: yf.download does not
+        # build them exactly like Ticker.history, so they must never stand in
+        # for what get_stock_data serves
+        bulk_keys = {symbol: ('bulk_history', symbol, start_date, end_date) for symbol in symbols}
+        results = {}
+        if self.ttl:
+            for symbol in symbols:
+                for key in (keys[symbol], bulk_keys[symbol]):
+                    data = self.cache.get(key)
+                    if data is not MISSING:
+                        results[symbol] = data
+                        break
+        missing = [symbol for symbol in symbols if symbol not in results]
+        if not missing:
+            return results
+        if self.offline:
+            for symbol in missing:
+                results[symbol] = synthetic_history(symbol, start_date, end_date)
+                self.cache.set(keys[symbol], results[symbol], self.ttl)
+            return {symbol: results[symbol] for symbol in symbols}
+
+        def download():
+            # Timezone-aware index and dividend/split columns, like Ticker.history
+            return yf.download(
+                missing, start=start_date, end=end_date, group_by='ticker', auto_adjust=True,
+                actions=True, ignore_tz=False, threads=False, progress=False,
+                session=self.upstream.session, timeout=self.upstream.timeout
+            )
+
+        def last_good(symbol: str, error: UpstreamError) -> pd.DataFrame:
+            data = self.cache.get(keys[symbol], allow_stale=True)
+            return data if data is not MISSING else self._cached(bulk_keys[symbol], error)
+
+        try:
+            raw = self.upstream.call(download)
+        except UpstreamError as e:
+            results.update({symbol: last_good(symbol, e) for symbol in missing})
+            return {symbol: results[symbol] for symbol in symbols}
+        except Exception as e:
+            raise Exception(f"Error fetching data for {', '.join(missing)}: {str(e)}")
+
+        for symbol in missing:
+            data = raw[symbol] if isinstance(raw.columns, pd.MultiIndex) else raw
+            data = data.dropna(how='all')
+            if data.empty:
+                raise Exception(f"Error fetching data for {symbol}: No data found between {start_date} and {end_date}")
+            self.cache.set(bulk_keys[symbol], data, self.ttl)
+            results[symbol] = data
+        return {symbol: results[symbol] for symbol in symbols}
+
     def get_stock_info(self, symbol: str) -> Dict[str, Any]:
         """
         Get basic stock information
-        
+
         Args:
             symbol: Stock symbol
-            
+
         Returns:
             Dictionary with stock info
         """
-        try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-            
+        key = ('info', symbol)
+
+        def fetch():
+            if self.offline:
+                return synthetic_info(symbol)
+            info = self.upstream.call(lambda: self._ticker(symbol).info)
             return {
                 "symbol": symbol,
                 "name": info.get("longName", "Unknown"),
@@ -58,24 +170,33 @@ class StockDataService:
                 "market_cap": info.get("marketCap", 0),
                 "current_price": info.get("currentPrice", 0)
             }
+
+        try:
+            return self.cache.get_or_fill(key, fetch, self.ttl)
+        except UpstreamError as e:
+            return self._cached(key, e)
         except Exception as e:
             raise Exception(f"Error fetching info for {symbol}: {str(e)}")
-    
+
     def get_live_price(self, symbol: str) -> float:
         """
         Get current live price for a stock
-        
+
         Args:
             symbol: Stock symbol
-            
+
         Returns:
             Current price
         """
+        # A live price is never served from cache; a stale price would be misleading
+        if self.offline:
+            return synthetic_info(symbol)["current_price"]
         try:
-            ticker = yf.Ticker(symbol)
-            return ticker.info.get("currentPrice", 0)
+            return self.upstream.call(lambda: self._ticker(symbol).info).get("currentPrice", 0)
+        except UpstreamError:
+            raise
         except Exception as e:
             raise Exception(f"Error fetching live price for {symbol}: {str(e)}")
 
 # Create a global instance
-stock_data_service = StockDataService() 
\ No newline at end of file
+stock_data_service = StockDataService()
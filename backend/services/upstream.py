@@ -0,0 +1,263 @@
+import random
+import threading
+import time
+from typing import Any, Callable, Iterator, Optional
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    # Recent yfinance releases only accept curl_cffi sessions
+    from curl_cffi import requests as curl_requests
+except ImportError:
+    curl_requests = None
+
+try:
+    # Unknown symbols and bad periods: yfinance raises these with raise_errors=True
+    from yfinance.exceptions import YFInvalidPeriodError, YFTickerMissingError
+    CLIENT_ERRORS = (YFTickerMissingError, YFInvalidPeriodError)
+except ImportError:
+    CLIENT_ERRORS = ()
+
+
+class UpstreamError(Exception):
+    """Raised when an upstream call fails after all retries"""
+
+
+class UpstreamUnavailableError(UpstreamError):
+    """Raised without calling upstream while its circuit breaker is open"""
+
+
+def build_session(pool_size: int = 10, prefer_curl_cffi: bool = True):
+    """
+    Create a pooled HTTP session to share across upstream calls
+
+    Args:
+        pool_size: Maximum number of pooled connections per host (requests sessions)
+        prefer_curl_cffi: Use a curl_cffi session when the package is installed
+
+    Returns:
+        curl_cffi or requests session
+    """
+    if prefer_curl_cffi and curl_requests is not None:
+        return curl_requests.Session(impersonate="chrome")
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing ``rate`` calls per second with bursts of ``capacity``"""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available"""
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until a token is available
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if a token was taken, False on timeout
+        """
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            self.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Stops calling an upstream after repeated failures
+
+    After ``failure_threshold`` consecutive failures the circuit opens and calls
+    are rejected for ``reset_timeout`` seconds. Then one trial call is let
+    through (half-open): success closes the circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now"""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+            self._trial_running = False
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+                 rng: Optional[random.Random] = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = rng or random.Random()
+
+    def delays(self) -> Iterator[float]:
+        """Delays to sleep before each retry (``max_attempts - 1`` of them)"""
+        for attempt in range(self.max_attempts - 1):
+            yield self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Whether a failed call is worth retrying
+
+    Throttling (429), server errors, timeouts and connection problems are
+    retried; client errors and bad input (e.g. unknown symbols) are not.
+    """
+    if isinstance(error, CLIENT_ERRORS):
+        return False
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return not isinstance(error, (ValueError, LookupError, TypeError))
+
+
+class Upstream:
+    """
+    A rate-limited, retried and circuit-broken upstream service
+
+    Args:
+        name: Name used in error messages
+        session: Shared pooled HTTP session
+        rate_limiter: Token bucket shared by every call to this upstream
+        retry: Retry policy for transient failures
+        breaker: Circuit breaker for this upstream
+        timeout: Per-request timeout in seconds
+        sleep: Sleep function (injectable for tests)
+    """
+
+    def __init__(self, name: str, session=None, rate_limiter: Optional[TokenBucket] = None,
+                 retry: Optional[RetryPolicy] = None, breaker: Optional[CircuitBreaker] = None,
+                 timeout: float = 10, sleep: Callable[[float], None] = time.sleep):
+        self.name = name
+        self.session = session if session is not None else build_session()
+        self.rate_limiter = rate_limiter or TokenBucket(rate=2, capacity=5)
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.timeout = timeout
+        self.sleep = sleep
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call ``fn`` under the rate limit, retrying transient failures
+
+        Non-retryable errors are re-raised unchanged and do not count against
+        the circuit breaker.
+
+        Raises:
+            UpstreamUnavailableError: If the circuit is open
+            UpstreamError: If every attempt failed
+        """
+        if not self.breaker.allow():
+            raise UpstreamUnavailableError(f"{self.name} is temporarily unavailable (circuit open)")
+
+        delays = self.retry.delays()
+        while True:
+            self.rate_limiter.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    # The upstream answered; the request itself was bad
+                    self.breaker.record_success()
+                    raise
+                delay = next(delays, None)
+                if delay is None:
+                    self.breaker.record_failure()
+                    raise UpstreamError(f"{self.name} request failed after {self.retry.max_attempts} attempts: {e}") from e
+                self.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
+
+    def get(self, url: str, **kwargs):
+        """GET ``url`` through the pooled session, raising for HTTP error statuses"""
+        timeout = kwargs.pop("timeout", self.timeout)
+
+        def request():
+            response = self.session.get(url, timeout=timeout, **kwargs)
+            response.raise_for_status()
+            return response
+
+        return self.call(request)
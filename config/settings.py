@@ -3,6 +3,8 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 class Settings:
     DEBUG = os.getenv("DEBUG", "True").lower() == "true"
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data/quantdash.db")
@@ -11,5 +13,27 @@ class Settings:
     YAHOO_FINANCE_API_KEY = os.getenv("YAHOO_FINANCE_API_KEY", "")
     ALPACA_API_KEY = os.getenv("ALPACA_API_KEY", "")
     ALPACA_SECRET_KEY = os.getenv("ALPACA_SECRET_KEY", "")
+    
+    # Upstream market-data calls (Yahoo Finance)
+    UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", "10"))
+    UPSTREAM_POOL_SIZE = int(os.getenv("UPSTREAM_POOL_SIZE", "10"))
+    UPSTREAM_RATE_PER_SECOND = float(os.getenv("UPSTREAM_RATE_PER_SECOND", "2"))
+    UPSTREAM_BURST = float(os.getenv("UPSTREAM_BURST", "5"))
+    UPSTREAM_MAX_ATTEMPTS = int(os.getenv("UPSTREAM_MAX_ATTEMPTS", "3"))
+    UPSTREAM_BACKOFF_BASE = float(os.getenv("UPSTREAM_BACKOFF_BASE", "0.5"))
+    UPSTREAM_BACKOFF_MAX = float(os.getenv("UPSTREAM_BACKOFF_MAX", "8"))
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+    
+    # Serving: uvicorn worker processes (uvicorn reads WEB_CONCURRENCY too)
+    API_WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+    # Serve deterministic synthetic prices instead of calling Yahoo Finance (load tests, offline dev)
+    OFFLINE_DATA = os.getenv("OFFLINE_DATA", "False").lower() == "true"
+    
+    # Cache shared by all worker processes
+    SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", os.path.join(PROJECT_ROOT, "data", "cache", "shared_cache.db"))
+    SHARED_CACHE_MAX_ENTRIES = int(os.getenv("SHARED_CACHE_MAX_ENTRIES", "512"))
+    STOCK_DATA_TTL = float(os.getenv("STOCK_DATA_TTL", "900"))  # seconds; 0 disables
+    BACKTEST_CACHE_TTL = float(os.getenv("BACKTEST_CACHE_TTL", "900"))  # seconds; 0 disables
 
 settings = Settings()
\ No newline at end of file
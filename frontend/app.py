@@ -5,6 +5,9 @@ from datetime import date
 # API_URL = "http://localhost:8000"
 API_URL = "https://quant-dash-mwbx.onrender.com"
 
+# Target number of points per chart series (downsampled server-side)
+CHART_MAX_POINTS = 2000
+
 # st.write("Backend API URL:", API_URL)
 # try:
 #     r = requests.get(f"{API_URL}/strategies", timeout=10)
@@ -109,7 +112,17 @@ if strategies:
 if not strategies:
     st.warning("No strategies available. Please make sure the backend is running and try again.")
 else:
-    if st.sidebar.button("Run Backtest"):
+    run_clicked = st.sidebar.button("Run Backtest")
+
+    # --- 2b. Strategy comparison settings ---
+    st.sidebar.markdown("**Compare Strategies**")
+    compare_idxs = st.sidebar.multiselect(
+        "Strategies to compare", range(len(strategy_names)),
+        default=list(range(len(strategy_names))), format_func=lambda i: strategy_names[i]
+    )
+    compare_clicked = st.sidebar.button("Compare Strategies")
+
+    if run_clicked:
         with st.spinner("Running backtest..."):
             params = {
                 "symbol": symbol,
@@ -117,6 +130,7 @@ else:
                 "start_date": start_date.strftime("%Y-%m-%d"),
                 "end_date": end_date.strftime("%Y-%m-%d"),
                 "initial_capital": initial_capital,
+                "max_points": CHART_MAX_POINTS,
                 **strategy_params  # Add strategy parameters here
             }
             resp = requests.get(f"{API_URL}/backtest", params=params)
@@ -140,66 +154,93 @@ else:
                 risk_cols[2].metric("Sortino Ratio", f"{results['sortino_ratio']:.2f}" if results['sortino_ratio'] is not None else "-")
                 risk_cols[3].metric("Calmar Ratio", f"{results['calmar_ratio']:.2f}" if results['calmar_ratio'] is not None else "-")
                 
-                # --- 5. Show Chart with Price and Buy/Sell Markers ---
+                # --- 5. Show Chart with Price, Buy/Sell Markers, Equity and Drawdown ---
                 import plotly.graph_objs as go
+                from plotly.subplots import make_subplots
 
-                # Fetch historical price data for the same period
-                price_resp = requests.get(
-                    f"{API_URL}/stock/{symbol}/data",
-                    params={"start_date": start_date.strftime("%Y-%m-%d"), "end_date": end_date.strftime("%Y-%m-%d")}
-                )
-                if price_resp.status_code == 200 and price_resp.json().get("success"):
-                    price_data = price_resp.json()["data"]["data"]
-                    price_dates = [row["Date"] if "Date" in row else row["Datetime"] for row in price_data]
-                    close_prices = [row["Close"] for row in price_data]
-
-                    # Price line
-                    price_trace = go.Scatter(
-                        x=price_dates,
-                        y=close_prices,
-                        mode="lines",
-                        name="Stock Price"
-                    )
-                else:
-                    price_trace = None
+                # The backtest response already carries aligned (and downsampled) chart series
+                chart = results["chart"]
 
-                # Buy/Sell markers on the price line
-                buy_dates = [trade["date"] for trade in results["trades"] if trade["action"] == "BUY"]
-                sell_dates = [trade["date"] for trade in results["trades"] if trade["action"] == "SELL"]
+                fig = make_subplots(
+                    rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.04,
+                    row_heights=[0.5, 0.3, 0.2],
+                    subplot_titles=("Price & Trades", "Portfolio Value", "Drawdown (%)")
+                )
 
-                # Find the price at each buy/sell date
-                buy_prices = [next((row["Close"] for row in price_data if str(row.get("Date", row.get("Datetime")))[:10] == str(date)[:10]), None) for date in buy_dates]
-                sell_prices = [next((row["Close"] for row in price_data if str(row.get("Date", row.get("Datetime")))[:10] == str(date)[:10]), None) for date in sell_dates]
+                # Price line
+                fig.add_trace(go.Scatter(x=chart["dates"], y=chart["price"], mode="lines", name="Stock Price"), row=1, col=1)
 
-                buy_markers = go.Scatter(
-                    x=buy_dates,
-                    y=buy_prices,
+                # Buy/Sell markers on the price line
+                fig.add_trace(go.Scatter(
+                    x=chart["buy"]["dates"],
+                    y=chart["buy"]["prices"],
                     mode="markers",
                     marker=dict(symbol="triangle-up", color="green", size=12),
                     name="Buy"
-                )
-                sell_markers = go.Scatter(
-                    x=sell_dates,
-                    y=sell_prices,
+                ), row=1, col=1)
+                fig.add_trace(go.Scatter(
+                    x=chart["sell"]["dates"],
+                    y=chart["sell"]["prices"],
                     mode="markers",
                     marker=dict(symbol="triangle-down", color="red", size=12),
                     name="Sell"
-                )
+                ), row=1, col=1)
 
-                # Combine traces
-                fig = go.Figure()
-                if price_trace:
-                    fig.add_trace(price_trace)
-                fig.add_trace(buy_markers)
-                fig.add_trace(sell_markers)
-                fig.update_layout(title="Strategy Backtest", xaxis_title="Date", yaxis_title="Price")
+                # Equity curve and drawdown
+                fig.add_trace(go.Scatter(x=chart["dates"], y=chart["equity"], mode="lines", name="Portfolio Value"), row=2, col=1)
+                fig.add_trace(go.Scatter(
+                    x=chart["dates"], y=chart["drawdown"], mode="lines", fill="tozeroy",
+                    line=dict(color="firebrick"), name="Drawdown"
+                ), row=3, col=1)
+
+                fig.update_layout(title="Strategy Backtest", height=800)
+                fig.update_xaxes(title_text="Date", row=3, col=1)
 
                 st.plotly_chart(fig, use_container_width=True)
+                if chart["downsampled"]:
+                    st.caption(f"Chart downsampled to {chart['points']} of {chart['total_points']} points.")
                 
                 # --- 6. Show Trades Table ---
                 st.subheader("Trade Log")
                 st.dataframe(results["trades"])
             else:
                 st.error(f"Backtest failed: {resp.json().get('detail', 'Unknown error')}")
+    elif compare_clicked:
+        with st.spinner("Comparing strategies..."):
+            payload = {
+                "symbol": symbol,
+                "start_date": start_date.strftime("%Y-%m-%d"),
+                "end_date": end_date.strftime("%Y-%m-%d"),
+                "initial_capital": initial_capital,
+                "max_points": CHART_MAX_POINTS,
+                # The selected strategy uses the sidebar parameters, the others their defaults
+                "strategies": [
+                    {"strategy_id": strategy_ids[i], "parameters": strategy_params if i == strategy_idx else {}}
+                    for i in compare_idxs
+                ]
+            }
+            resp = requests.post(f"{API_URL}/compare", json=payload)
+            if resp.status_code == 200 and resp.json().get("success"):
+                comparison = resp.json()["results"]
+                st.success(f"Compared {len(compare_idxs)} strategies on {symbol}!")
+
+                # --- 7. Show Comparison Metrics and Equity Curves ---
+                import plotly.graph_objs as go
+
+                st.markdown("### Strategy Comparison")
+                st.dataframe([
+                    {k: v for k, v in row.items() if k not in ("label", "strategy_id", "parameters")}
+                    for row in comparison["metrics"]
+                ])
+
+                fig = go.Figure()
+                names = {row["label"]: row["strategy_name"] for row in comparison["metrics"]}
+                for label, values in comparison["equity"].items():
+                    fig.add_trace(go.Scatter(x=comparison["dates"], y=values, mode="lines", name=names.get(label, label)))
+                fig.update_layout(title="Portfolio Value by Strategy", xaxis_title="Date", yaxis_title="Portfolio Value ($)")
+
+                st.plotly_chart(fig, use_container_width=True)
+            else:
+                st.error(f"Comparison failed: {resp.json().get('detail', 'Unknown error')}")
     else:
         st.info("Set your parameters and click 'Run Backtest' to begin.")
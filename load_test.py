@@ -0,0 +1,190 @@
+"""
+Load test for the /backtest endpoint
+
+Starts the API on offline synthetic data with 1, 2, 4, ... up to N uvicorn
+workers and measures how /backtest throughput scales with them:
+
+    python load_test.py --max-workers 4 --duration 20
+
+Backtest result caching is off by default so every request runs a backtest;
+pass --result-cache to measure cached responses instead. Price data always
+goes through the shared cache (warmed before each run).
+"""
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+import requests
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SYMBOLS = ["AAPL", "MSFT", "GOOG", "AMZN", "NVDA", "META", "TSLA", "JPM"]
+START_DATE = "2010-01-01"
+END_DATE = "2025-01-01"
+
+# strategy id -> parameter choices
+STRATEGIES = {
+    "moving_average_crossover": {"short_window": [10, 20, 30], "long_window": [50, 100, 200]},
+    "rsi_strategy": {"period": [7, 14, 21], "oversold": [25, 30], "overbought": [70, 75]},
+    "macd_strategy": {"fast_period": [8, 12], "slow_period": [21, 26], "signal_period": [9]},
+    "bollinger_bands_strategy": {"window": [10, 20, 30], "num_std": [1.5, 2.0, 2.5]},
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int, cache_path: str, result_cache: bool) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "OFFLINE_DATA": "true",
+        "WEB_CONCURRENCY": str(workers),
+        "SHARED_CACHE_PATH": cache_path,
+        "BACKTEST_CACHE_TTL": "900" if result_cache else "0",
+    }
+    command = [
+        sys.executable, "-m", "uvicorn", "backend.main:app",
+        "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning"
+    ]
+    return subprocess.Popen(command, cwd=ROOT, env=env)
+
+
+def wait_until_ready(url: str, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{url}/health", timeout=1).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"API at {url} did not start within {timeout}s")
+
+
+def stop_server(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def random_request(rng: random.Random, summary_only: bool, max_points: int) -> dict:
+    strategy_id = rng.choice(list(STRATEGIES))
+    params = {
+        "symbol": rng.choice(SYMBOLS),
+        "strategy_id": strategy_id,
+        "start_date": START_DATE,
+        "end_date": END_DATE,
+        **{name: rng.choice(choices) for name, choices in STRATEGIES[strategy_id].items()},
+    }
+    if summary_only:
+        params["summary_only"] = "true"
+    else:
+        params["max_points"] = max_points
+    return params
+
+
+def run_load(url: str, concurrency: int, duration: float, seed: int, summary_only: bool,
+             max_points: int) -> dict:
+    """Send /backtest requests from ``concurrency`` client threads for ``duration`` seconds"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(client_seed: int):
+        rng = random.Random(client_seed)
+        session = requests.Session()
+        while time.monotonic() < deadline:
+            params = random_request(rng, summary_only, max_points)
+            started = time.perf_counter()
+            try:
+                ok = session.get(f"{url}/backtest", params=params, timeout=120).ok
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - started
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors[0] += 1
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=client, args=(seed * 1000 + i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    latencies = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "throughput": len(latencies) / elapsed,
+        "p50": float(np.percentile(latencies, 50)) if len(latencies) else float("nan"),
+        "p95": float(np.percentile(latencies, 95)) if len(latencies) else float("nan"),
+    }
+
+
+def worker_counts(max_workers: int):
+    counts = {1, max_workers}
+    count = 2
+    while count < max_workers:
+        counts.add(count)
+        count *= 2
+    return sorted(counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure /backtest throughput for 1..N API workers")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Client threads (default: 2 x max workers, the same for every run)")
+    parser.add_argument("--duration", type=float, default=15, help="Seconds of load per worker count")
+    parser.add_argument("--summary-only", action="store_true", help="Request metrics only, no chart series")
+    parser.add_argument("--max-points", type=int, default=2000, help="Chart points per series")
+    parser.add_argument("--result-cache", action="store_true", help="Keep the shared backtest result cache on")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    concurrency = args.concurrency or 2 * args.max_workers
+
+    print(f"{os.cpu_count()} CPUs, {concurrency} client threads, {args.duration:g}s per run, "
+          f"result cache {'on' if args.result_cache else 'off'}")
+    print(f"{'workers':>7} {'req/s':>9} {'speedup':>8} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+
+    baseline = None
+    for workers in worker_counts(args.max_workers):
+        with tempfile.TemporaryDirectory() as directory:
+            port = free_port()
+            url = f"http://127.0.0.1:{port}"
+            server = start_server(workers, port, os.path.join(directory, "cache.db"), args.result_cache)
+            try:
+                wait_until_ready(url)
+                # Warm the shared price cache so every run measures backtests, not data generation
+                for symbol in SYMBOLS:
+                    requests.get(f"{url}/stock/{symbol}/data",
+                                 params={"start_date": START_DATE, "end_date": END_DATE}, timeout=120)
+                result = run_load(url, concurrency, args.duration, args.seed, args.summary_only, args.max_points)
+            finally:
+                stop_server(server)
+
+        if baseline is None:
+            baseline = result["throughput"]
+        speedup = result["throughput"] / baseline if baseline else float("nan")
+        print(f"{workers:>7} {result['throughput']:>9.1f} {speedup:>7.2f}x "
+              f"{result['p50']:>9.1f} {result['p95']:>9.1f} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import math
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+# One row per executed trade; the date is stored as the bar position in the data index
+TRADE_DTYPE = np.dtype([
+    ('bar', np.int64),
+    ('action', np.int8),  # 1 = BUY, -1 = SELL
+    ('price', np.float64),
+    ('shares', np.float64),
+    ('capital', np.float64)
+])
+ACTIONS = {1: 'BUY', -1: 'SELL'}
+
+
+def is_daily(index) -> bool:
+    """Whether every timestamp falls on midnight (daily or coarser bars)"""
+    index = pd.DatetimeIndex(index)
+    return bool((index.normalize() == index).all())
+
+
+def format_dates(index, daily: Optional[bool] = None) -> List[str]:
+    """
+    Format timestamps as 'YYYY-MM-DD', or 'YYYY-MM-DD HH:MM' for intraday data
+
+    Args:
+        index: Timestamps (timezone-aware timestamps keep their local wall time)
+        daily: Force the date-only format; detected from the timestamps if None
+
+    Returns:
+        List of date strings
+    """
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    if daily is None:
+        daily = is_daily(index)
+    strings = np.datetime_as_string(index.values, unit='D' if daily else 'm')
+    return strings.tolist() if daily else np.char.replace(strings, 'T', ' ').tolist()
+
+
+def _json_number(value):
+    """Plain Python number, with NaN/inf mapped to None (JSON has no NaN)"""
+    if isinstance(value, (np.integer, int)) and not isinstance(value, bool):
+        return int(value)
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+class BacktestReport:
+    """
+    Result of a backtest
+
+    Per-bar and per-trade data are kept as NumPy arrays (the equity curve as
+    float64, trades as a structured array referencing bar positions) and only
+    turned into Python lists and strings by ``to_dict`` at the API boundary.
+    Summary-only reports carry no equity curve at all.
+
+    ``state`` is the checkpoint after the last bar, which
+    ``BaseStrategy.extend_backtest`` continues from. Reports from an extension
+    cover only the new bars in ``trades``, ``equity`` and ``index``, while
+    ``metrics`` cover the whole run.
+
+    Scalar metrics can be read with ``report['total_return']``.
+    """
+
+    __slots__ = ('strategy_name', 'metrics', 'trades', 'equity', 'index', 'state')
+
+    def __init__(self, strategy_name: str, metrics: Dict[str, Any], trades: np.ndarray,
+                 index: pd.Index, equity: Optional[np.ndarray] = None, state=None):
+        self.strategy_name = strategy_name
+        self.metrics = metrics
+        self.trades = trades
+        self.index = index
+        self.equity = equity
+        self.state = state
+
+    def __getitem__(self, key: str):
+        if key == 'strategy_name':
+            return self.strategy_name
+        return self.metrics[key]
+
+    @property
+    def has_series(self) -> bool:
+        return self.equity is not None
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-ready scalar metrics"""
+        return {key: _json_number(value) for key, value in self.metrics.items()}
+
+    def date_strings(self) -> List[str]:
+        """Bar dates as 'YYYY-MM-DD' strings"""
+        return format_dates(self.index, daily=True)
+
+    def trade_records(self, daily: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """Trades as a list of JSON-ready dicts"""
+        if daily is None:
+            daily = is_daily(self.index)
+        dates = format_dates(self.index[self.trades['bar']], daily=daily)
+        return [
+            {'date': date, 'action': ACTIONS[int(action)], 'price': float(price),
+             'shares': float(shares), 'capital': float(capital)}
+            for date, (_, action, price, shares, capital) in zip(dates, self.trades.tolist())
+        ]
+
+    def to_dict(self, include_series: bool = True) -> Dict[str, Any]:
+        """
+        Convert to a JSON-serializable dictionary
+
+        Args:
+            include_series: Include the per-bar 'portfolio_values' and 'dates'
+                (ignored for summary-only reports)
+
+        Returns:
+            Dictionary with metrics, trades and optionally the equity curve
+        """
+        results = {'strategy_name': self.strategy_name, **self.summary(), 'trades': self.trade_records()}
+        if include_series and self.has_series:
+            results['portfolio_values'] = self.equity.tolist()
+            results['dates'] = self.date_strings()
+        return results
@@ -0,0 +1,287 @@
+import json
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from strategies.base.results import TRADE_DTYPE
+
+
+def _running_sum(start: float, values: np.ndarray) -> float:
+    """Add ``values`` to ``start`` strictly left to right"""
+    # np.add.accumulate is sequential (np.sum is pairwise), so summing a
+    # history in one go or in several pieces gives bit-identical totals
+    return float(np.add.accumulate(np.concatenate(([start], values)))[-1])
+
+
+def _sample_std(count: int, total: float, total_sq: float) -> float:
+    """Sample standard deviation (ddof=1) from running count, sum and sum of squares"""
+    mean = total / count
+    return float(np.sqrt(max((total_sq - total * mean) / (count - 1), 0.0)))
+
+
+def frame_to_dict(frame: pd.DataFrame) -> Dict[str, Any]:
+    """JSON-ready copy of a small DataFrame with a DatetimeIndex"""
+    index = pd.DatetimeIndex(frame.index)
+    return {
+        'index': [timestamp.isoformat() for timestamp in index],
+        'tz': str(index.tz) if index.tz is not None else None,
+        'columns': {column: frame[column].astype(float).tolist() for column in frame.columns}
+    }
+
+
+def frame_from_dict(values: Dict[str, Any]) -> pd.DataFrame:
+    """Inverse of ``frame_to_dict``"""
+    if values['tz']:
+        index = pd.to_datetime(values['index'], utc=True).tz_convert(values['tz'])
+    else:
+        index = pd.DatetimeIndex(pd.to_datetime(values['index']))
+    return pd.DataFrame(values['columns'], index=index)
+
+
+class BacktestState:
+    """
+    Checkpoint of a backtest after its last bar
+
+    Holds everything needed to carry a backtest forward over new bars without
+    revisiting the history: the open position, cash and shares, trade counts,
+    the running equity peak and worst drawdown, running sums of the per-bar
+    returns (for Sharpe, volatility and Sortino) and the strategy's own signal
+    state (see ``BaseStrategy.signal_state``).
+
+    Full backtests run through the same ``advance`` step starting from a fresh
+    state, so extending a checkpoint by new bars gives exactly the metrics of a
+    full recompute over the combined data.
+    """
+
+    __slots__ = (
+        'strategy', 'initial_capital', 'n_bars', 'last_date',
+        'position', 'capital', 'shares', 'entry_price',
+        'first_close', 'last_close', 'last_value', 'peak', 'max_drawdown',
+        'total_trades', 'winning_trades',
+        'n_returns', 'return_sum', 'return_sum_sq',
+        'n_downside', 'downside_sum', 'downside_sum_sq',
+        'signal_state'
+    )
+
+    def __init__(self, initial_capital: float = 10000, strategy: Optional[str] = None):
+        self.strategy = strategy  # Strategy name and parameters the state belongs to (JSON)
+        self.initial_capital = initial_capital
+        self.n_bars = 0
+        self.last_date = None
+        self.position = 0.0  # 1 while long, 0 while flat
+        self.capital = initial_capital
+        self.shares = 0
+        self.entry_price = np.nan
+        self.first_close = np.nan
+        self.last_close = np.nan
+        self.last_value = np.nan
+        self.peak = -np.inf
+        self.max_drawdown = np.nan
+        self.total_trades = 0
+        self.winning_trades = 0
+        self.n_returns = 0
+        self.return_sum = 0.0
+        self.return_sum_sq = 0.0
+        self.n_downside = 0
+        self.downside_sum = 0.0
+        self.downside_sum_sq = 0.0
+        self.signal_state = None
+
+    def advance(self, index: pd.Index, closes: np.ndarray, signals: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Process new bars and update the state in place
+
+        Buys all-in at the close on a buy signal while flat and sells the whole
+        position at the close on a sell signal while long.
+
+        Args:
+            index: Timestamps of the new bars
+            closes: Close prices of the new bars
+            signals: Signals for the new bars (1 buy, -1 sell, 0 hold)
+
+        Returns:
+            Tuple of (portfolio value per new bar, trades with bar positions
+            relative to the new bars)
+        """
+        n_bars = len(closes)
+        if not n_bars:
+            return np.empty(0), np.empty(0, dtype=TRADE_DTYPE)
+
+        # Position held at the end of each bar follows the last buy (1) / sell (0) signal
+        target = np.where(signals == 1, 1.0, np.where(signals == -1, 0.0, np.nan))
+        position = pd.Series(target).ffill().fillna(self.position).to_numpy()
+
+        # Trades happen where the position changes; capital compounds trade by trade
+        previous = np.concatenate(([self.position], position[:-1]))
+        trade_bars = np.flatnonzero(position != previous)
+        trades = np.empty(len(trade_bars), dtype=TRADE_DTYPE)
+        capital = self.capital
+        shares = self.shares
+        for k, bar in enumerate(trade_bars.tolist()):
+            price = closes[bar]
+            if position[bar] == 1:
+                shares = capital / price
+                trades[k] = (bar, 1, price, shares, capital)
+                self.entry_price = price
+            else:
+                capital = shares * price
+                shares = 0
+                trades[k] = (bar, -1, price, 0, capital)
+                # Each complete trade is a buy followed by a sell
+                self.total_trades += 1
+                self.winning_trades += int(price > self.entry_price)
+
+        # Portfolio value: shares held * close while long, cash while flat
+        held_shares = np.full(n_bars, np.nan)
+        cash = np.full(n_bars, np.nan)
+        held_shares[trade_bars] = trades['shares']
+        cash[trade_bars] = trades['capital']
+        held_shares = pd.Series(held_shares).ffill().fillna(self.shares).to_numpy()
+        cash = pd.Series(cash).ffill().fillna(self.capital).to_numpy()
+        portfolio_values = np.where(position == 1, held_shares * closes, cash)
+
+        self.record(index, closes, portfolio_values)
+        self.position = float(position[-1])
+        self.capital = float(capital)
+        self.shares = float(shares)
+        return portfolio_values, trades
+
+    def record(self, index: pd.Index, closes: Optional[np.ndarray], portfolio_values: np.ndarray):
+        """
+        Update the running peak, drawdown and return sums with new portfolio values
+
+        Args:
+            index: Timestamps of the new bars
+            closes: Close prices of the new bars for the buy & hold benchmark
+                (None when there is no single benchmark price)
+            portfolio_values: Portfolio value at the end of each new bar
+        """
+        # Running peak and worst drawdown
+        peaks = np.maximum.accumulate(np.concatenate(([self.peak], portfolio_values)))[1:]
+        drawdown = ((portfolio_values - peaks) / peaks) * 100
+        self.peak = float(peaks[-1])
+        self.max_drawdown = float(np.fmin.reduce(np.concatenate(([self.max_drawdown], drawdown))))
+
+        # Running sums of the bar-to-bar returns, continuing from the previous bar
+        values = portfolio_values if self.n_bars == 0 else np.concatenate(([self.last_value], portfolio_values))
+        returns = values[1:] / values[:-1] - 1
+        returns = returns[~np.isnan(returns)]
+        downside = returns[returns < 0]
+        self.n_returns += len(returns)
+        self.return_sum = _running_sum(self.return_sum, returns)
+        self.return_sum_sq = _running_sum(self.return_sum_sq, returns * returns)
+        self.n_downside += len(downside)
+        self.downside_sum = _running_sum(self.downside_sum, downside)
+        self.downside_sum_sq = _running_sum(self.downside_sum_sq, downside * downside)
+
+        if closes is not None:
+            if self.n_bars == 0:
+                self.first_close = float(closes[0])
+            self.last_close = float(closes[-1])
+        self.n_bars += len(portfolio_values)
+        self.last_date = pd.Timestamp(index[-1])
+        self.last_value = float(portfolio_values[-1])
+
+    def metrics(self) -> Dict[str, Any]:
+        """Performance metrics for every bar processed so far"""
+        initial_capital = self.initial_capital
+        final_capital = self.last_value
+        total_return = ((final_capital - initial_capital) / initial_capital) * 100
+        buy_hold_return = ((self.last_close - self.first_close) / self.first_close) * 100
+        win_rate = (self.winning_trades / self.total_trades * 100) if self.total_trades > 0 else 0
+
+        # --- Risk Metrics ---
+        sharpe_ratio = volatility = sortino_ratio = np.nan
+        if self.n_returns > 1:
+            mean = self.return_sum / self.n_returns
+            std = _sample_std(self.n_returns, self.return_sum, self.return_sum_sq)
+            # Sharpe Ratio (risk-free rate = 0)
+            if std != 0:
+                sharpe_ratio = (mean / std) * np.sqrt(252)
+            # Volatility (annualized)
+            volatility = std * np.sqrt(252)
+            # Sortino Ratio (downside risk)
+            downside_std = np.nan
+            if self.n_downside > 1:
+                downside_std = _sample_std(self.n_downside, self.downside_sum, self.downside_sum_sq)
+            if downside_std != 0:
+                sortino_ratio = (mean / downside_std) * np.sqrt(252)
+        # Calmar Ratio
+        max_drawdown = self.max_drawdown
+        calmar_ratio = (total_return / abs(max_drawdown)) if max_drawdown != 0 else np.nan
+
+        return {
+            'initial_capital': initial_capital,
+            'final_capital': final_capital,
+            'total_return': total_return,
+            'buy_hold_return': buy_hold_return,
+            'win_rate': win_rate,
+            'max_drawdown': max_drawdown,
+            'total_trades': self.total_trades,
+            'winning_trades': self.winning_trades,
+            'sharpe_ratio': sharpe_ratio,
+            'volatility': volatility,
+            'sortino_ratio': sortino_ratio,
+            'calmar_ratio': calmar_ratio
+        }
+
+    def last_date_for(self, index: pd.DatetimeIndex) -> pd.Timestamp:
+        """``last_date`` made comparable with ``index`` (timezone-aware or naive)"""
+        last_date = self.last_date
+        if index.tz is not None and last_date.tz is None:
+            # Checkpoint made from timezone-naive bars of the same exchange dates
+            return last_date.tz_localize(index.tz)
+        if index.tz is None and last_date.tz is not None:
+            return last_date.tz_localize(None)
+        return last_date
+
+    def matches(self, data: pd.DataFrame) -> bool:
+        """
+        Whether ``data`` still has the checkpoint's last bar at the close it saw
+
+        Auto-adjusted prices rescale the whole history after a dividend or
+        split, so bars fetched later no longer continue the checkpoint's
+        prices. Differences below 1e-9 (relative) are treated as float noise.
+        """
+        if self.last_date is None or np.isnan(self.last_close):
+            return True
+        last_date = self.last_date_for(data.index)
+        if last_date not in data.index:
+            return False
+        return bool(np.isclose(data['Close'].loc[last_date], self.last_close, rtol=1e-9, atol=0))
+
+    def copy(self) -> 'BacktestState':
+        """Independent copy of the state"""
+        return BacktestState.from_dict(self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the state
+
+        Floats round-trip exactly through ``json`` (NaN and infinity included),
+        so a stored checkpoint resumes bit-for-bit.
+        """
+        values = {name: getattr(self, name) for name in self.__slots__}
+        if self.last_date is not None:
+            values['last_date'] = self.last_date.isoformat()
+            values['tz'] = str(self.last_date.tz) if self.last_date.tz is not None else None
+        return values
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, Any]) -> 'BacktestState':
+        """Rebuild a state saved with ``to_dict``"""
+        values = json.loads(json.dumps(values))
+        state = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(state, name, values[name])
+        if state.last_date is not None:
+            state.last_date = pd.Timestamp(state.last_date)
+            if values.get('tz'):
+                state.last_date = state.last_date.tz_convert(values['tz'])
+        return state
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def from_json(cls, text: str) -> 'BacktestState':
+        return cls.from_dict(json.loads(text))
@@ -1,8 +1,12 @@
+import json
 from abc import ABC, abstractmethod
 import pandas as pd
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional
 from datetime import datetime
 import numpy as np
+from strategies.indicators import indicator_cache
+from strategies.base.results import BacktestReport, TRADE_DTYPE
+from strategies.base.state import BacktestState, frame_to_dict, frame_from_dict
 
 class BaseStrategy(ABC):
     """Base class for all trading strategies"""
@@ -25,133 +29,173 @@ class BaseStrategy(ABC):
         """
         pass
     
-    def backtest(self, data: pd.DataFrame, initial_capital: float = 10000) -> Dict[str, Any]:
+    def signal_conditions(self, data) -> Optional[Tuple[Any, Any]]:
+        """
+        Boolean buy and sell conditions (optional hook)
+        
+        Strategies that express their logic as vectorized conditions implement
+        this. It is then also used for batches of price paths, where every
+        column of ``data`` is a DataFrame with one column per path.
+        
+        Args:
+            data: DataFrame with OHLCV data, or a batch of price paths
+            
+        Returns:
+            Tuple of boolean (buy, sell) conditions, or None (the default) if
+            the strategy only implements ``generate_signals``
+        """
+        return None
+    
+    def generate_signals_batch(self, closes: pd.DataFrame) -> np.ndarray:
+        """
+        Generate signals for many price paths at once
+        
+        Args:
+            closes: Close prices, one column per path (bars x paths)
+            
+        Returns:
+            int8 array (bars x paths) with 1 for buy, -1 for sell, 0 for hold
+        """
+        # Synthetic paths have no intrabar range, so every price column is the close
+        batch = {'Open': closes, 'High': closes, 'Low': closes, 'Close': closes}
+        try:
+            conditions = self.signal_conditions(batch)
+        finally:
+            indicator_cache.discard(batch)
+        if conditions is not None:
+            buy_signal, sell_signal = conditions
+            buy_signal = np.asarray(buy_signal, dtype=bool)
+            sell_signal = np.asarray(sell_signal, dtype=bool)
+            return np.where(sell_signal, -1, np.where(buy_signal, 1, 0)).astype(np.int8)
+        
+        # Strategies without vectorized conditions are evaluated path by path
+        signals = np.empty(closes.shape, dtype=np.int8)
+        for j, column in enumerate(closes.columns):
+            path = closes[column]
+            frame = pd.DataFrame({'Open': path, 'High': path, 'Low': path, 'Close': path})
+            signals[:, j] = np.asarray(self.generate_signals(frame), dtype=np.int8)
+        return signals
+    
+    def backtest(self, data: pd.DataFrame, initial_capital: float = 10000,
+                 include_series: bool = True) -> BacktestReport:
         """
         Run backtest on historical data
         
+        Buys all-in at the close on a buy signal while flat and sells the whole
+        position at the close on a sell signal while long. The report carries
+        a checkpoint (``report.state``) that ``extend_backtest`` can continue
+        from when new bars arrive.
+        
         Args:
             data: DataFrame with OHLCV data
             initial_capital: Starting capital amount
+            include_series: Keep the per-bar equity curve in the report; turn
+                off for sweeps and scans that only need the metrics
             
         Returns:
-            Dictionary with backtest results
+            BacktestReport with metrics, trades and (optionally) the equity curve
         """
-        # Generate signals
-        signals = self.generate_signals(data)
+        state = BacktestState(initial_capital, self._state_key())
+        signals = np.asarray(self.generate_signals(data))
+        portfolio_values, trades = state.advance(data.index, data['Close'].to_numpy(dtype=float), signals)
+        state.signal_state = self.signal_state(data)
+        return BacktestReport(
+            self.name, state.metrics(), trades, data.index,
+            equity=portfolio_values if include_series else None, state=state
+        )
+    
+    @property
+    def lookback(self) -> Optional[int]:
+        """
+        Bars of history needed to compute the signal on the next bar
         
-        # Initialize tracking variables
-        position = 0  # 0 = no position, 1 = long position
-        capital = initial_capital
-        shares = 0
-        trades = []
+        Strategies whose signals only depend on a fixed window of recent bars
+        return its length, which lets ``extend_backtest`` recompute signals
+        from a short tail instead of the whole history. None (the default)
+        means the strategy cannot be extended incrementally.
+        """
+        return None
+    
+    def signal_state(self, data: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        """
+        JSON-ready state needed to generate signals for bars after ``data``
         
-        # Track performance
-        portfolio_values = []
-        dates = []
+        The default keeps the last ``lookback`` bars. Strategies with
+        recursive indicators (e.g. EMAs) override this together with
+        ``extend_signals`` to keep the recursion state instead.
         
-        for i in range(len(data)):
-            current_price = data.iloc[i]['Close']
-            current_date = data.index[i]
-            
-            # Check for buy signal
-            if signals.iloc[i] == 1 and position == 0:
-                shares = capital / current_price
-                position = 1
-                trades.append({
-                    'date': current_date,
-                    'action': 'BUY',
-                    'price': current_price,
-                    'shares': shares,
-                    'capital': capital
-                })
-            
-            # Check for sell signal
-            elif signals.iloc[i] == -1 and position == 1:
-                capital = shares * current_price
-                shares = 0
-                position = 0
-                trades.append({
-                    'date': current_date,
-                    'action': 'SELL',
-                    'price': current_price,
-                    'shares': 0,
-                    'capital': capital
-                })
-            
-            # Calculate current portfolio value
-            if position == 1:
-                portfolio_value = shares * current_price
-            else:
-                portfolio_value = capital
+        Args:
+            data: DataFrame with OHLCV data the strategy has seen so far
             
-            portfolio_values.append(portfolio_value)
-            dates.append(current_date)
-        
-        # Calculate final portfolio value
-        if position == 1:
-            final_capital = shares * data.iloc[-1]['Close']
-        else:
-            final_capital = capital
-        
-        # Calculate metrics
-        total_return = ((final_capital - initial_capital) / initial_capital) * 100
-        buy_hold_return = ((data.iloc[-1]['Close'] - data.iloc[0]['Close']) / data.iloc[0]['Close']) * 100
+        Returns:
+            State dictionary, or None if incremental extension is unsupported
+        """
+        if self.lookback is None:
+            return None
+        columns = [column for column in ('Open', 'High', 'Low', 'Close', 'Volume') if column in data]
+        return {'tail': frame_to_dict(data[columns].iloc[-self.lookback:])}
+    
+    def extend_signals(self, signal_state: Dict[str, Any], new_data: pd.DataFrame) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Generate signals for new bars from a saved signal state
         
-        # Calculate win rate
-        winning_trades = 0
-        total_trades = len(trades) // 2  # Each complete trade has buy + sell
+        Args:
+            signal_state: State from ``signal_state`` for the bars before ``new_data``
+            new_data: DataFrame with the new OHLCV bars
+            
+        Returns:
+            Tuple of (signals for the new bars, signal state after them)
+        """
+        tail = frame_from_dict(signal_state['tail'])
+        combined = pd.concat([tail, new_data[tail.columns]])
+        try:
+            signals = np.asarray(self.generate_signals(combined))[-len(new_data):]
+        finally:
+            indicator_cache.discard(combined)
+        return signals, self.signal_state(combined)
+    
+    def can_extend(self, state: BacktestState) -> bool:
+        """Whether ``extend_backtest`` can continue from ``state``"""
+        return state.signal_state is not None and state.strategy == self._state_key()
+    
+    def extend_backtest(self, state: BacktestState, new_data: pd.DataFrame,
+                        include_series: bool = True) -> BacktestReport:
+        """
+        Continue a backtest over bars that arrived after its checkpoint
         
-        for i in range(0, len(trades) - 1, 2):
-            if i + 1 < len(trades):
-                buy_price = trades[i]['price']
-                sell_price = trades[i + 1]['price']
-                if sell_price > buy_price:
-                    winning_trades += 1
+        Runs in time proportional to the number of new bars. The metrics are
+        identical to a full backtest over the old and new bars combined.
         
-        win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
+        Args:
+            state: Checkpoint from a previous report (``report.state``); not modified
+            new_data: DataFrame with OHLCV data; bars up to the checkpoint are ignored
+            include_series: Keep the equity curve of the new bars in the report
+            
+        Returns:
+            BacktestReport with metrics for the whole run, trades and equity for
+            the new bars and the updated checkpoint
+        """
+        if state.strategy != self._state_key():
+            raise ValueError(f"Checkpoint does not belong to '{self.name}' with these parameters")
+        if state.signal_state is None:
+            raise ValueError(f"'{self.name}' does not support incremental backtests; rerun the full backtest")
         
-        # Calculate max drawdown
-        portfolio_series = pd.Series(portfolio_values, index=dates)
-        rolling_max = portfolio_series.expanding().max()
-        drawdown = ((portfolio_series - rolling_max) / rolling_max) * 100
-        max_drawdown = drawdown.min()
-
-        # --- Risk Metrics ---
-        # Daily returns
-        portfolio_series = portfolio_series.astype(float)
-        daily_returns = portfolio_series.pct_change().dropna()
-        # Sharpe Ratio (risk-free rate = 0)
-        sharpe_ratio = np.nan
-        if daily_returns.std() != 0 and len(daily_returns) > 1:
-            sharpe_ratio = (daily_returns.mean() / daily_returns.std()) * np.sqrt(252)
-        # Volatility (annualized)
-        volatility = daily_returns.std() * np.sqrt(252) if len(daily_returns) > 1 else np.nan
-        # Sortino Ratio (downside risk)
-        downside_returns = daily_returns[daily_returns < 0]
-        sortino_ratio = np.nan
-        if downside_returns.std() != 0 and len(daily_returns) > 1:
-            sortino_ratio = (daily_returns.mean() / downside_returns.std()) * np.sqrt(252)
-        # Calmar Ratio
-        calmar_ratio = (total_return / abs(max_drawdown)) if max_drawdown != 0 else np.nan
-
-        return {
-            'strategy_name': self.name,
-            'initial_capital': initial_capital,
-            'final_capital': final_capital,
-            'total_return': total_return,
-            'buy_hold_return': buy_hold_return,
-            'win_rate': win_rate,
-            'max_drawdown': max_drawdown,
-            'total_trades': total_trades,
-            'winning_trades': winning_trades,
-            'trades': trades,
-            'portfolio_values': portfolio_values,
-            'dates': [d.strftime('%Y-%m-%d') for d in dates],
-            'sharpe_ratio': sharpe_ratio,
-            'volatility': volatility,
-            'sortino_ratio': sortino_ratio,
-            'calmar_ratio': calmar_ratio
-        }
+        new_data = new_data[new_data.index > state.last_date_for(new_data.index)]
+        state = state.copy()
+        if len(new_data):
+            signals, signal_state = self.extend_signals(state.signal_state, new_data)
+            portfolio_values, trades = state.advance(new_data.index, new_data['Close'].to_numpy(dtype=float), signals)
+            state.signal_state = signal_state
+        else:
+            portfolio_values, trades = np.empty(0), np.empty(0, dtype=TRADE_DTYPE)
+        return BacktestReport(
+            self.name, state.metrics(), trades, new_data.index,
+            equity=portfolio_values if include_series else None, state=state
+        )
+    
+    def _state_key(self) -> str:
+        """Identifies the strategy and parameters a checkpoint was made with"""
+        return json.dumps({'name': self.name, 'parameters': self.get_parameters()}, sort_keys=True, default=str)
     
     def get_parameters(self) -> Dict[str, Any]:
         """Get strategy parameters"""
@@ -159,4 +203,22 @@ class BaseStrategy(ABC):
     
     def set_parameters(self, parameters: Dict[str, Any]):
         """Set strategy parameters"""
-        self.parameters.update(parameters) 
\ No newline at end of file
+        self.parameters.update(parameters)
+    
+    def clone(self, **parameters) -> 'BaseStrategy':
+        """
+        Create a new instance of this strategy with some parameters overridden
+        
+        Args:
+            **parameters: Strategy-specific parameters overriding the current ones
+            
+        Returns:
+            New strategy instance
+        """
+        self._check_parameters(parameters)
+        return type(self)(**{**self.get_parameters(), **parameters})
+    
+    def _check_parameters(self, parameters: Dict[str, Any]):
+        unknown = set(parameters) - set(self.get_parameters())
+        if unknown:
+            raise ValueError(f"Unknown parameters for '{self.name}': {', '.join(sorted(unknown))}")
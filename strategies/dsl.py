@@ -0,0 +1,509 @@
+"""
+Declarative rule language for composite strategies
+
+A composite strategy is described by a buy rule and a sell rule, e.g.
+
+    name: Trend + momentum
+    buy: SMA($fast) crosses above SMA($slow) AND RSI(14) < 70
+    sell: SMA($fast) crosses below SMA($slow) OR RSI(14) > 80
+    parameters: {fast: 20, slow: 50}
+
+Both rules are compiled into one signal graph. Identical subexpressions
+(``SMA($fast)`` above) become a single node and are evaluated once, and the
+indicator nodes go through ``strategies.indicators`` so their series are also
+shared with other strategies running on the same data.
+"""
+import json
+import math
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from strategies.base.strategy import BaseStrategy
+from strategies import indicators
+
+try:
+    import yaml
+except ImportError:  # PyYAML is in requirements.txt; JSON specs work without it
+    yaml = None
+
+
+class RuleSyntaxError(ValueError):
+    """Raised when a rule cannot be parsed or refers to unknown names"""
+
+
+# Price columns usable as bare names in rules and as indicator arguments
+COLUMNS = {'OPEN': 'Open', 'HIGH': 'High', 'LOW': 'Low', 'CLOSE': 'Close', 'PRICE': 'Close', 'VOLUME': 'Volume'}
+
+# name -> (indicator function, number of numeric arguments, output fields, default field)
+INDICATORS = {
+    'SMA': (indicators.sma, 1, None, None),
+    'EMA': (indicators.ema, 1, None, None),
+    'STD': (indicators.rolling_std, 1, None, None),
+    'HIGHEST': (indicators.rolling_max, 1, None, None),
+    'LOWEST': (indicators.rolling_min, 1, None, None),
+    'ROC': (indicators.roc, 1, None, None),
+    'RSI': (indicators.rsi, 1, None, None),
+    'ATR': (indicators.atr, 1, None, None),
+    'MACD': (indicators.macd, 3, ('line', 'signal'), 'line'),
+    'BB': (indicators.bollinger_bands, 2, ('middle', 'upper', 'lower'), 'middle'),
+    'STOCH': (indicators.stochastic, 2, ('k', 'd'), 'k'),
+}
+
+# Numeric arguments (by position) that scale a result instead of counting bars;
+# every other numeric argument is a window or period and must be an integer >= 1
+SCALE_ARGUMENTS = {'BB': {1}}
+
+# Recursive indicators depend on the whole history, not on a window of recent bars
+RECURSIVE_INDICATORS = {'EMA', 'MACD'}
+
+KEYWORDS = {'AND', 'OR', 'NOT', 'CROSSES', 'ABOVE', 'BELOW'}
+COMPARISONS = {'<', '<=', '>', '>=', '==', '!='}
+COMMUTATIVE = {'and', 'or', '+', '*', '==', '!='}
+# Operations whose result is a condition rather than a value
+CONDITIONS = {'and', 'or', 'not', 'crosses_above', 'crosses_below'} | COMPARISONS
+
+TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<number>\d+\.\d*|\.\d+|\d+)
+      | (?P<param>\$[A-Za-z_]\w*)
+      | (?P<name>[A-Za-z_]\w*)
+      | (?P<op><=|>=|==|!=|[<>+\-*/(),.])
+    )""", re.VERBOSE)
+
+
+def tokenize(rule: str) -> List[Tuple[str, str]]:
+    """Split a rule into (kind, text) tokens"""
+    tokens = []
+    pos = 0
+    rule = rule.rstrip()
+    while pos < len(rule):
+        match = TOKEN_RE.match(rule, pos)
+        if not match:
+            raise RuleSyntaxError(f"Unexpected character {rule[pos:].lstrip()[:1]!r} at position {pos} in {rule!r}")
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == 'name' and text.upper() in KEYWORDS:
+            kind, text = 'keyword', text.upper()
+        tokens.append((kind, text))
+        pos = match.end()
+    return tokens
+
+
+class SignalGraph:
+    """
+    Directed acyclic graph of vectorized operations
+
+    Nodes are interned by their canonical key, so adding an expression that
+    already exists returns the existing node. Children are always added before
+    their parents, which makes insertion order a valid evaluation order.
+    """
+
+    def __init__(self):
+        self.nodes = []  # (op, args)
+        self._index = {}
+
+    def add(self, op: str, *args) -> int:
+        if op in COMMUTATIVE:
+            args = tuple(sorted(args))
+        key = (op, args)
+        if key not in self._index:
+            self._index[key] = len(self.nodes)
+            self.nodes.append(key)
+        return self._index[key]
+
+    def evaluate(self, data: pd.DataFrame, outputs: List[int]) -> List[Any]:
+        """Evaluate every node once, in order, and return the requested outputs"""
+        values = []
+        for op, args in self.nodes:
+            values.append(_evaluate_node(data, op, args, values))
+        return [values[i] for i in outputs]
+
+
+def _shift(value):
+    return value.shift(1) if isinstance(value, (pd.Series, pd.DataFrame)) else value
+
+
+def _evaluate_node(data: pd.DataFrame, op: str, args: tuple, values: list):
+    if op == 'const':
+        return args[0]
+    if op == 'column':
+        return data[args[0]]
+    if op == 'indicator':
+        name, params, field = args
+        function, _, fields, _ = INDICATORS[name]
+        result = function(data, *params)
+        return result[fields.index(field)] if fields else result
+
+    operands = [values[i] for i in args]
+    if op == 'not':
+        # Constant conditions are plain bools, where ~True is -2
+        return np.logical_not(operands[0])
+    if op == 'neg':
+        return -operands[0]
+    a, b = operands
+    if op == 'and':
+        return a & b
+    if op == 'or':
+        return a | b
+    if op == 'crosses_above':
+        return (a > b) & (_shift(a) <= _shift(b))
+    if op == 'crosses_below':
+        return (a < b) & (_shift(a) >= _shift(b))
+    if op == '<':
+        return a < b
+    if op == '<=':
+        return a <= b
+    if op == '>':
+        return a > b
+    if op == '>=':
+        return a >= b
+    if op == '==':
+        return a == b
+    if op == '!=':
+        return a != b
+    if op == '+':
+        return a + b
+    if op == '-':
+        return a - b
+    if op == '*':
+        return a * b
+    if op == '/':
+        return a / b
+    raise RuleSyntaxError(f"Unknown operation '{op}'")
+
+
+class _Parser:
+    """Recursive-descent parser emitting nodes straight into a SignalGraph"""
+
+    def __init__(self, rule: str, graph: SignalGraph, parameters: Dict[str, Any]):
+        self.rule = rule
+        self.tokens = tokenize(rule)
+        self.pos = 0
+        self.graph = graph
+        self.parameters = parameters
+
+    def parse(self) -> int:
+        if not self.tokens:
+            raise RuleSyntaxError("Rule is empty")
+        node = self.parse_or()
+        if self.pos < len(self.tokens):
+            self.fail(f"unexpected {self.tokens[self.pos][1]!r}")
+        return self.condition(node)
+
+    def condition(self, node: int) -> int:
+        """Check that ``node`` is a condition (e.g. a comparison), not a value"""
+        op, args = self.graph.nodes[node]
+        if op not in CONDITIONS:
+            self.fail(f"{self.describe(op, args)} is a value, not a condition (compare it, e.g. '> 0')")
+        return node
+
+    @staticmethod
+    def describe(op: str, args: tuple) -> str:
+        if op in ('indicator', 'column'):
+            return args[0]
+        return repr(args[0]) if op == 'const' else "an arithmetic expression"
+
+    def fail(self, message: str):
+        raise RuleSyntaxError(f"Invalid rule {self.rule!r}: {message}")
+
+    def peek(self) -> Tuple[Optional[str], Optional[str]]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def accept(self, text: str) -> bool:
+        if self.peek()[1] == text:
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, text: str):
+        if not self.accept(text):
+            found = self.peek()[1]
+            self.fail(f"expected {text!r} but found {found!r}" if found else f"expected {text!r} at end of rule")
+
+    def parse_or(self) -> int:
+        node = self.parse_and()
+        while self.accept('OR'):
+            node = self.graph.add('or', self.condition(node), self.condition(self.parse_and()))
+        return node
+
+    def parse_and(self) -> int:
+        node = self.parse_not()
+        while self.accept('AND'):
+            node = self.graph.add('and', self.condition(node), self.condition(self.parse_not()))
+        return node
+
+    def parse_not(self) -> int:
+        if self.accept('NOT'):
+            return self.graph.add('not', self.condition(self.parse_not()))
+        return self.parse_comparison()
+
+    def parse_comparison(self) -> int:
+        left = self.parse_sum()
+        if self.accept('CROSSES'):
+            if self.accept('ABOVE'):
+                return self.graph.add('crosses_above', left, self.parse_sum())
+            self.expect('BELOW')
+            return self.graph.add('crosses_below', left, self.parse_sum())
+        op = self.peek()[1]
+        if op in COMPARISONS:
+            self.pos += 1
+            return self.graph.add(op, left, self.parse_sum())
+        return left
+
+    def parse_sum(self) -> int:
+        node = self.parse_product()
+        while self.peek()[1] in ('+', '-'):
+            op = self.tokens[self.pos][1]
+            self.pos += 1
+            node = self.graph.add(op, node, self.parse_product())
+        return node
+
+    def parse_product(self) -> int:
+        node = self.parse_unary()
+        while self.peek()[1] in ('*', '/'):
+            op = self.tokens[self.pos][1]
+            self.pos += 1
+            node = self.graph.add(op, node, self.parse_unary())
+        return node
+
+    def parse_unary(self) -> int:
+        if self.accept('-'):
+            return self.graph.add('neg', self.parse_unary())
+        return self.parse_atom()
+
+    def parse_atom(self) -> int:
+        kind, text = self.peek()
+        if kind is None:
+            self.fail("unexpected end of rule")
+        self.pos += 1
+        if kind in ('number', 'param'):
+            return self.graph.add('const', self.value(kind, text))
+        if text == '(':
+            node = self.parse_or()
+            self.expect(')')
+            return node
+        if kind != 'name':
+            self.fail(f"unexpected {text!r}")
+
+        name = text.upper()
+        if name in COLUMNS:
+            return self.graph.add('column', COLUMNS[name])
+        if name not in INDICATORS:
+            self.fail(f"unknown name {text!r}")
+        return self.parse_indicator(name)
+
+    def parse_indicator(self, name: str) -> int:
+        _, n_numeric, fields, default_field = INDICATORS[name]
+        params = []
+        self.expect('(')
+        if not self.accept(')'):
+            while True:
+                kind, text = self.peek()
+                self.pos += 1
+                if kind in ('number', 'param'):
+                    params.append(self.argument(name, len(params), text, self._normalize(self.value(kind, text))))
+                elif kind == 'name' and text.upper() in COLUMNS and len(params) == n_numeric:
+                    params.append(COLUMNS[text.upper()])
+                else:
+                    self.fail(f"invalid argument {text!r} to {name}")
+                if self.accept(')'):
+                    break
+                self.expect(',')
+        if len(params) < n_numeric:
+            self.fail(f"{name} takes {n_numeric} numeric argument(s)")
+
+        field = default_field
+        if self.accept('.'):
+            kind, text = self.peek()
+            self.pos += 1
+            if not fields or kind != 'name' or text.lower() not in fields:
+                self.fail(f"{name} has no output {text!r}")
+            field = text.lower()
+        return self.graph.add('indicator', name, tuple(params), field)
+
+    def value(self, kind: str, text: str):
+        if kind == 'param':
+            if text[1:] not in self.parameters:
+                self.fail(f"parameter {text!r} has no value")
+            return self.parameters[text[1:]]
+        return float(text) if '.' in text else int(text)
+
+    def argument(self, name: str, position: int, text: str, value):
+        """Check a numeric indicator argument: windows are whole numbers of bars"""
+        if position not in SCALE_ARGUMENTS.get(name, ()) and (not isinstance(value, int) or value < 1):
+            shown = f"{text} = {value!r}" if text.startswith('$') else repr(value)
+            self.fail(f"{name} window {shown} must be a whole number of bars (1 or more)")
+        return value
+
+    @staticmethod
+    def _normalize(value):
+        # Whole-number floats (e.g. from YAML/JSON) are valid window lengths
+        return int(value) if isinstance(value, float) and value.is_integer() else value
+
+
+class CompiledRules:
+    """Buy and sell rules compiled into one shared signal graph"""
+
+    def __init__(self, buy: str, sell: str, parameters: Dict[str, Any]):
+        self.graph = SignalGraph()
+        self.buy = _Parser(buy, self.graph, parameters).parse()
+        self.sell = _Parser(sell, self.graph, parameters).parse()
+
+    def evaluate(self, data) -> Tuple[pd.Series, pd.Series]:
+        """Return boolean buy and sell conditions for ``data`` (a DataFrame or a batch of paths)"""
+        buy, sell = self.graph.evaluate(data, [self.buy, self.sell])
+        return _as_bool(buy, data), _as_bool(sell, data)
+
+    @property
+    def lookback(self) -> Optional[int]:
+        """Bars of history the rules look at, or None if they use a recursive indicator"""
+        window = 1
+        shifts = 0
+        for op, args in self.graph.nodes:
+            if op == 'indicator':
+                name, params, _ = args
+                if name in RECURSIVE_INDICATORS:
+                    return None
+                # Windows plus one bar for indicators built on price changes; an overestimate is harmless
+                window = max(window, math.ceil(sum(p for p in params if not isinstance(p, str))) + 1)
+            elif op in ('crosses_above', 'crosses_below'):
+                shifts += 1
+        return window + shifts
+
+
+def _as_bool(value, data):
+    if not isinstance(value, (pd.Series, pd.DataFrame)):
+        # A rule that reduced to a constant holds (or not) on every bar
+        template = data['Close']
+        if isinstance(template, pd.DataFrame):
+            value = pd.DataFrame(bool(value), index=template.index, columns=template.columns)
+        else:
+            value = pd.Series(bool(value), index=template.index)
+    return value.fillna(False).astype(bool)
+
+
+@lru_cache(maxsize=256)
+def _compile(buy: str, sell: str, parameters: Tuple[Tuple[str, Any], ...]) -> CompiledRules:
+    return CompiledRules(buy, sell, dict(parameters))
+
+
+def compile_rules(buy: str, sell: str, parameters: Optional[Dict[str, Any]] = None) -> CompiledRules:
+    """
+    Compile a buy/sell rule pair, reusing previous compilations
+
+    Args:
+        buy: Buy rule, e.g. 'SMA(20) crosses above SMA(50) AND RSI(14) < 70'
+        sell: Sell rule
+        parameters: Values for ``$name`` placeholders used in the rules
+
+    Returns:
+        CompiledRules
+    """
+    parameters = parameters or {}
+    _validate_parameters(parameters)
+    return _compile(buy, sell, tuple(sorted(parameters.items())))
+
+
+def _validate_parameters(parameters):
+    # Values must be hashable numbers for the compile cache; bools are ints to
+    # Python but never a sensible window or threshold
+    if not isinstance(parameters, dict):
+        raise RuleSyntaxError(f"Parameters must be a mapping of names to numbers, got {parameters!r}")
+    for name, value in parameters.items():
+        if not isinstance(name, str) or isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise RuleSyntaxError(f"Parameter {name!r} must be a number, got {value!r}")
+
+
+class CompositeStrategy(BaseStrategy):
+    """
+    Strategy defined by declarative buy and sell rules
+
+    Buys on bars where the buy rule holds and sells where the sell rule holds.
+    Rule placeholders such as ``$fast`` take their values from the strategy
+    parameters, so composites can be swept like the built-in strategies.
+    """
+
+    def __init__(self, buy: str, sell: str, name: str = "Composite Strategy",
+                 description: str = "", parameters: Optional[Dict[str, Any]] = None):
+        super().__init__(
+            name=name,
+            description=description or f"Buy when {buy}; sell when {sell}"
+        )
+        self.buy_rule = buy
+        self.sell_rule = sell
+        self.parameters = dict(parameters or {})
+        # Compile eagerly so invalid rules are reported before any data is fetched
+        compile_rules(self.buy_rule, self.sell_rule, self.parameters)
+
+    def clone(self, **parameters):
+        self._check_parameters(parameters)
+        return CompositeStrategy(self.buy_rule, self.sell_rule, self.name, self.description,
+                                 {**self.parameters, **parameters})
+
+    @property
+    def lookback(self) -> Optional[int]:
+        return compile_rules(self.buy_rule, self.sell_rule, self.parameters).lookback
+
+    def signal_conditions(self, data):
+        return compile_rules(self.buy_rule, self.sell_rule, self.parameters).evaluate(data)
+
+    def generate_signals(self, data: pd.DataFrame) -> pd.Series:
+        """
+        Generate buy/sell signals by evaluating the compiled rules
+
+        Args:
+            data: DataFrame with OHLCV data
+
+        Returns:
+            Series with signals (1 for buy, -1 for sell, 0 for hold)
+        """
+        buy_signal, sell_signal = self.signal_conditions(data)
+        signals = pd.Series(0, index=data.index)
+        signals[buy_signal] = 1
+        signals[sell_signal] = -1
+        return signals
+
+
+def load_spec(spec) -> Dict[str, Any]:
+    """
+    Normalize a composite strategy spec
+
+    Args:
+        spec: Dict, or a JSON/YAML document, with 'buy' and 'sell' rules and
+            optional 'name', 'description' and 'parameters'
+
+    Returns:
+        Spec dictionary
+    """
+    if isinstance(spec, str):
+        try:
+            spec = json.loads(spec)
+        except ValueError:
+            if yaml is None:
+                raise RuleSyntaxError("Spec is not valid JSON (install PyYAML to use YAML specs)")
+            try:
+                spec = yaml.safe_load(spec)
+            except yaml.YAMLError as e:
+                raise RuleSyntaxError(f"Spec is neither valid JSON nor YAML: {e}")
+    if not isinstance(spec, dict):
+        raise RuleSyntaxError("Spec must be a mapping with 'buy' and 'sell' rules")
+
+    missing = [key for key in ('buy', 'sell') if not spec.get(key)]
+    if missing:
+        raise RuleSyntaxError(f"Spec is missing: {', '.join(missing)}")
+    _validate_parameters(spec.get('parameters') or {})
+    return spec
+
+
+def strategy_from_spec(spec) -> CompositeStrategy:
+    """Build a CompositeStrategy from a spec dict or JSON/YAML document"""
+    spec = load_spec(spec)
+    return CompositeStrategy(
+        buy=str(spec['buy']),
+        sell=str(spec['sell']),
+        name=spec.get('name') or "Composite Strategy",
+        description=spec.get('description', ""),
+        parameters=spec.get('parameters') or {}
+    )
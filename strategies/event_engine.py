@@ -0,0 +1,848 @@
+"""
+Event-driven, order-level backtesting on OHLC bars
+
+``BaseStrategy.backtest`` trades all-in at the close on +1/-1 signals. The
+``EventEngine`` here sits beside it for strategies that need real orders:
+market, market-on-close, limit, stop and trailing-stop orders that fill
+inside a bar when its High/Low reaches the order's price.
+
+The engine does not step through every bar in Python. Strategies declare the
+bars they want to act on (``EventStrategy.wake_bars``), each symbol's resting
+orders live in price-ordered heaps whose tops are the first orders that can
+fill, and the next fill of a book is found with a vectorized search over the
+upcoming bars. The event loop then jumps straight from one event to the next,
+so bars where nothing happens cost nothing but a slice of NumPy work.
+
+Existing signal strategies run unchanged through ``SignalOrderStrategy``.
+"""
+import heapq
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+import pandas as pd
+from strategies.base.results import BacktestReport, TRADE_DTYPE, format_dates
+from strategies.base.state import BacktestState
+
+# Order types
+MARKET = 'market'  # Fills at the open of the next bar
+MARKET_ON_CLOSE = 'market_on_close'  # Fills at the close of the bar it is submitted on
+LIMIT = 'limit'
+STOP = 'stop'
+TRAILING_STOP = 'trailing_stop'
+ORDER_TYPES = (MARKET, MARKET_ON_CLOSE, LIMIT, STOP, TRAILING_STOP)
+
+BUY = 1
+SELL = -1
+
+# Order statuses
+OPEN = 'open'
+FILLED = 'filled'
+CANCELLED = 'cancelled'
+REJECTED = 'rejected'
+
+# One row per fill; bars are positions on the engine's timeline
+FILL_DTYPE = np.dtype([
+    ('bar', np.int64),
+    ('symbol', np.int32),  # Position in EventEngine.symbols
+    ('order_id', np.int64),
+    ('side', np.int8),  # 1 = BUY, -1 = SELL
+    ('quantity', np.float64),
+    ('price', np.float64),
+    ('value', np.float64),  # Cash paid (buys) or received (sells), commission included
+    ('commission', np.float64)
+])
+
+# Bars examined by the first step of a fill search; each further step doubles
+# up to MAX_SEARCH_CHUNK, so nearby fills are found cheaply and distant ones
+# in a few large vectorized steps
+SEARCH_CHUNK = 64
+MAX_SEARCH_CHUNK = 1 << 16
+
+
+def _first_touch(high: np.ndarray, low: np.ndarray, up: float, down: float, start: int) -> int:
+    """First position >= start where high >= up or low <= down, or len(high)"""
+    n = len(high)
+    chunk = SEARCH_CHUNK
+    while start < n:
+        stop = start + chunk
+        touched = (high[start:stop] >= up) | (low[start:stop] <= down)
+        first = int(touched.argmax())
+        if touched[first]:
+            return start + first
+        start = stop
+        chunk = min(chunk * 2, MAX_SEARCH_CHUNK)
+    return n
+
+
+class Order:
+    """
+    An order on one symbol
+
+    Orders are created with ``EventEngine.submit`` and can fill from the bar
+    after the one they are submitted on (market-on-close orders fill at once).
+    A quantity of None means "all available cash" for buys and "the whole
+    position" for sells, sized at the fill price.
+
+    Trailing stops track the best price since submission (highest High for
+    sells, lowest Low for buys) and trigger ``trail_amount`` or
+    ``trail_percent`` away from it. The stop level for a bar only uses the
+    bars before it, since the order of prices within a bar is unknown.
+    """
+
+    __slots__ = (
+        'id', 'symbol', 'side', 'quantity', 'order_type', 'limit_price', 'stop_price',
+        'trail_amount', 'trail_percent', 'tag', 'submitted_bar', 'status',
+        'fill_bar', 'fill_price', 'filled_quantity', 'extreme', 'extreme_bar'
+    )
+
+    def __init__(self, order_id: int, symbol: str, side: int, quantity: Optional[float], order_type: str,
+                 limit_price: Optional[float] = None, stop_price: Optional[float] = None,
+                 trail_amount: Optional[float] = None, trail_percent: Optional[float] = None,
+                 tag: Any = None, submitted_bar: int = -1):
+        self.id = order_id
+        self.symbol = symbol
+        self.side = side
+        self.quantity = quantity
+        self.order_type = order_type
+        self.limit_price = limit_price
+        self.stop_price = stop_price
+        self.trail_amount = trail_amount
+        self.trail_percent = trail_percent
+        self.tag = tag
+        self.submitted_bar = submitted_bar
+        self.status = OPEN
+        self.fill_bar = None
+        self.fill_price = None
+        self.filled_quantity = None
+        self.extreme = np.nan  # Best price seen by a trailing stop, up to extreme_bar
+        self.extreme_bar = submitted_bar
+
+    @property
+    def is_open(self) -> bool:
+        return self.status == OPEN
+
+    def trailing_level(self, extreme: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        """Stop level of a trailing stop for the given best price(s)"""
+        if self.side == SELL:
+            if self.trail_amount is not None:
+                return extreme - self.trail_amount
+            return extreme * (1 - self.trail_percent)
+        if self.trail_amount is not None:
+            return extreme + self.trail_amount
+        return extreme * (1 + self.trail_percent)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id, 'symbol': self.symbol, 'side': 'BUY' if self.side == BUY else 'SELL',
+            'quantity': self.quantity, 'order_type': self.order_type, 'limit_price': self.limit_price,
+            'stop_price': self.stop_price, 'trail_amount': self.trail_amount,
+            'trail_percent': self.trail_percent, 'status': self.status, 'fill_price': self.fill_price,
+            'filled_quantity': self.filled_quantity
+        }
+
+    def __repr__(self) -> str:
+        return (f"Order(id={self.id}, {self.symbol}, {'BUY' if self.side == BUY else 'SELL'} "
+                f"{self.quantity}, {self.order_type}, {self.status})")
+
+
+class OrderBook:
+    """
+    Resting orders of one symbol
+
+    Limit and stop orders sit in four heaps keyed so that the top of each is
+    the order that can fill first: the highest buy limit and the highest sell
+    stop fill first when the price falls, the lowest sell limit and the lowest
+    buy stop when it rises. Finding the next bar on which anything fills only
+    needs the four tops, the pending market orders and the trailing stops.
+    Cancelled orders are dropped lazily when they reach the top of a heap.
+    """
+
+    def __init__(self, open_: np.ndarray, high: np.ndarray, low: np.ndarray):
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.market: List[Order] = []
+        self.buy_limits = []  # (-limit, id, order)
+        self.sell_limits = []  # (limit, id, order)
+        self.buy_stops = []  # (stop, id, order)
+        self.sell_stops = []  # (-stop, id, order)
+        self.trailing: Dict[int, Order] = {}
+        self.version = 0  # Bumped on every reschedule, invalidating the queued event
+
+    def add(self, order: Order):
+        if order.order_type == MARKET:
+            self.market.append(order)
+        elif order.order_type == LIMIT:
+            if order.side == BUY:
+                heapq.heappush(self.buy_limits, (-order.limit_price, order.id, order))
+            else:
+                heapq.heappush(self.sell_limits, (order.limit_price, order.id, order))
+        elif order.order_type == STOP:
+            if order.side == BUY:
+                heapq.heappush(self.buy_stops, (order.stop_price, order.id, order))
+            else:
+                heapq.heappush(self.sell_stops, (-order.stop_price, order.id, order))
+        else:
+            self.trailing[order.id] = order
+
+    def remove(self, order: Order):
+        """Forget a cancelled order (heap entries are skipped once not open)"""
+        if order.order_type == MARKET:
+            self.market = [pending for pending in self.market if pending is not order]
+        self.trailing.pop(order.id, None)
+
+    @staticmethod
+    def _top(heap) -> Optional[Order]:
+        while heap and not heap[0][2].is_open:
+            heapq.heappop(heap)
+        return heap[0][2] if heap else None
+
+    def _advance_extreme(self, order: Order, bar: int):
+        """Bring a trailing stop's best price up to date with every bar before ``bar``"""
+        if order.extreme_bar >= bar - 1:
+            return
+        if order.side == SELL:
+            seen = np.fmax.reduce(self.high[order.extreme_bar + 1:bar])
+            order.extreme = float(np.fmax(order.extreme, seen))
+        else:
+            seen = np.fmin.reduce(self.low[order.extreme_bar + 1:bar])
+            order.extreme = float(np.fmin(order.extreme, seen))
+        order.extreme_bar = bar - 1
+
+    def _trailing_trigger(self, order: Order, start: int, end: int) -> int:
+        """First bar in [start, end) on which a trailing stop triggers, or end"""
+        self._advance_extreme(order, start)
+        chunk = SEARCH_CHUNK
+        extreme = order.extreme
+        while start < end:
+            stop = min(start + chunk, end)
+            # Best price before each bar of the chunk
+            if order.side == SELL:
+                extremes = np.fmax.accumulate(np.concatenate(([extreme], self.high[start:stop])))
+                touched = self.low[start:stop] <= order.trailing_level(extremes[:-1])
+            else:
+                extremes = np.fmin.accumulate(np.concatenate(([extreme], self.low[start:stop])))
+                touched = self.high[start:stop] >= order.trailing_level(extremes[:-1])
+            first = int(touched.argmax())
+            if touched[first]:
+                return start + first
+            extreme = float(extremes[-1])
+            start = stop
+            chunk = min(chunk * 2, MAX_SEARCH_CHUNK)
+        return end
+
+    def next_fill_bar(self, start: int) -> int:
+        """
+        First bar >= start on which any resting order fills
+
+        Args:
+            start: First bar to search from
+
+        Returns:
+            Bar position, or the number of bars if nothing fills
+        """
+        # Buy limits and sell stops fill when the Low falls to them, sell limits
+        # and buy stops when the High rises to them; the closest of each pair
+        # bounds one combined search
+        down = -np.inf
+        up = np.inf
+        order = self._top(self.buy_limits)
+        if order is not None:
+            down = order.limit_price
+        order = self._top(self.sell_stops)
+        if order is not None:
+            down = max(down, order.stop_price)
+        order = self._top(self.sell_limits)
+        if order is not None:
+            up = order.limit_price
+        order = self._top(self.buy_stops)
+        if order is not None:
+            up = min(up, order.stop_price)
+        if self.market:
+            # Market orders fill on the next bar the symbol trades (NaN never compares true)
+            up = -np.inf
+        n = len(self.low)
+        bar = n if (up == np.inf and down == -np.inf) else _first_touch(self.high, self.low, up, down, start)
+        for order in self.trailing.values():
+            bar = self._trailing_trigger(order, start, bar)
+        return bar
+
+    def triggered(self, bar: int) -> List[tuple]:
+        """
+        Take every order that fills on ``bar`` out of the book
+
+        Prices gapping through an order's level fill at the open, which is
+        better for limits and worse for stops.
+
+        Returns:
+            List of (order, fill price)
+        """
+        open_, high, low = self.open[bar], self.high[bar], self.low[bar]
+        fills = []
+        if self.market and not np.isnan(open_):
+            fills.extend((order, open_) for order in self.market if order.is_open)
+            self.market = []
+        heap = self.buy_limits
+        while self._top(heap) is not None and heap[0][2].limit_price >= low:
+            order = heapq.heappop(heap)[2]
+            fills.append((order, min(open_, order.limit_price)))
+        heap = self.sell_limits
+        while self._top(heap) is not None and heap[0][2].limit_price <= high:
+            order = heapq.heappop(heap)[2]
+            fills.append((order, max(open_, order.limit_price)))
+        heap = self.buy_stops
+        while self._top(heap) is not None and heap[0][2].stop_price <= high:
+            order = heapq.heappop(heap)[2]
+            fills.append((order, max(open_, order.stop_price)))
+        heap = self.sell_stops
+        while self._top(heap) is not None and heap[0][2].stop_price >= low:
+            order = heapq.heappop(heap)[2]
+            fills.append((order, min(open_, order.stop_price)))
+        for order in list(self.trailing.values()):
+            self._advance_extreme(order, bar)
+            level = order.trailing_level(order.extreme)
+            if order.side == SELL and low <= level:
+                fills.append((order, min(open_, level)))
+            elif order.side == BUY and high >= level:
+                fills.append((order, max(open_, level)))
+            else:
+                continue
+            del self.trailing[order.id]
+        return fills
+
+
+class EventStrategy:
+    """
+    Base class for strategies run by the ``EventEngine``
+
+    Subclasses place and cancel orders through the engine from ``on_bar``
+    (called at the close of the bars returned by ``wake_bars``) and
+    ``on_fill`` (called after each fill).
+    """
+
+    name = 'Event Strategy'
+
+    def wake_bars(self, symbol: str, data: pd.DataFrame) -> Optional[np.ndarray]:
+        """
+        Bars on which ``on_bar`` is called for a symbol
+
+        Returning only the bars where the strategy acts (e.g. where a signal
+        fires) lets the engine skip every other bar. The default, None, wakes
+        the strategy on every bar the symbol trades.
+
+        Args:
+            symbol: Symbol
+            data: OHLCV data of the symbol aligned to the engine's timeline
+                (rows of NaN where the symbol has no bar)
+
+        Returns:
+            Sorted array of bar positions, or None for every bar
+        """
+        return None
+
+    def on_start(self, engine: 'EventEngine'):
+        """Called once before the first bar"""
+
+    def on_bar(self, engine: 'EventEngine', symbol: str, bar: int):
+        """Called at the close of a wake bar, after that bar's fills"""
+
+    def on_fill(self, engine: 'EventEngine', order: Order):
+        """Called right after an order fills (``order.fill_price`` and ``order.filled_quantity`` are set)"""
+
+
+class EventEngine:
+    """
+    Event-driven backtester executing orders on OHLC bars
+
+    Args:
+        data: OHLC(V) DataFrame of one symbol, or {symbol: DataFrame}; several
+            symbols are aligned on the union of their timestamps
+        initial_capital: Starting cash
+        commission: Commission as a fraction of the traded value
+        slippage: Adverse price move, as a fraction, on market and stop fills
+        allow_short: Allow sells beyond the held position
+
+    Example:
+        engine = EventEngine(data, initial_capital=10000)
+        result = engine.run(SignalOrderStrategy(strategy, stop_loss=0.05))
+    """
+
+    def __init__(self, data: Union[pd.DataFrame, Dict[str, pd.DataFrame]], initial_capital: float = 10000,
+                 commission: float = 0.0, slippage: float = 0.0, allow_short: bool = False):
+        if isinstance(data, pd.DataFrame):
+            data = {'': data}
+        if not data:
+            raise ValueError("No data to backtest")
+        self.symbols = list(data)
+        self.index = data[self.symbols[0]].index
+        for symbol in self.symbols[1:]:
+            self.index = self.index.union(data[symbol].index)
+        self.data = {
+            symbol: frame if frame.index.equals(self.index) else frame.reindex(self.index)
+            for symbol, frame in data.items()
+        }
+        self.initial_capital = initial_capital
+        self.commission = commission
+        self.slippage = slippage
+        self.allow_short = allow_short
+
+        self._symbol_ids = {symbol: k for k, symbol in enumerate(self.symbols)}
+        self._prices = {
+            symbol: tuple(frame[column].to_numpy(dtype=float) for column in ('Open', 'High', 'Low', 'Close'))
+            for symbol, frame in self.data.items()
+        }
+        self._closes = {symbol: prices[3] for symbol, prices in self._prices.items()}
+        # Last valid close at each bar (0 before the first one): positions are
+        # marked at it through bars a symbol is missing
+        self._marks = {
+            symbol: pd.Series(closes).ffill().fillna(0.0).to_numpy() for symbol, closes in self._closes.items()
+        }
+        self._reset()
+
+    def _reset(self):
+        self.bar = -1
+        self._books = {symbol: OrderBook(*prices[:3]) for symbol, prices in self._prices.items()}
+        self.cash = float(self.initial_capital)
+        self.positions = {symbol: 0.0 for symbol in self.symbols}
+        self.orders: List[Order] = []
+        self._strategy = None
+        self._fills = []
+        self._cash_changes = []  # (bar, cash after)
+        self._position_changes = {symbol: [] for symbol in self.symbols}  # (bar, position after)
+        self._average_cost = {symbol: 0.0 for symbol in self.symbols}
+        self._round_trips = 0
+        self._winning_round_trips = 0
+        self._changed = set()
+
+    # --- Order API used by strategies ---
+
+    def submit(self, symbol: str, side: int, quantity: Optional[float] = None, order_type: str = MARKET,
+               limit_price: Optional[float] = None, stop_price: Optional[float] = None,
+               trail_amount: Optional[float] = None, trail_percent: Optional[float] = None,
+               tag: Any = None) -> Order:
+        """
+        Place an order
+
+        Args:
+            symbol: Symbol to trade ('' for a single-symbol engine)
+            side: BUY (1) or SELL (-1)
+            quantity: Shares; None buys with all available cash or sells the
+                whole position
+            order_type: One of ORDER_TYPES
+            limit_price: Limit price for LIMIT orders
+            stop_price: Stop price for STOP orders
+            trail_amount: Trailing distance in price units for TRAILING_STOP orders
+            trail_percent: Trailing distance as a fraction for TRAILING_STOP orders
+            tag: Free-form label kept on the order
+
+        Returns:
+            The order
+        """
+        if symbol not in self._books:
+            raise ValueError(f"Unknown symbol '{symbol}'")
+        if side not in (BUY, SELL):
+            raise ValueError("side must be BUY (1) or SELL (-1)")
+        if order_type not in ORDER_TYPES:
+            raise ValueError(f"Unknown order type '{order_type}'. Use one of: {', '.join(ORDER_TYPES)}")
+        if quantity is not None and not quantity > 0:
+            raise ValueError("quantity must be positive")
+        if order_type == LIMIT and limit_price is None:
+            raise ValueError("Limit orders need a limit_price")
+        if order_type == STOP and stop_price is None:
+            raise ValueError("Stop orders need a stop_price")
+        if order_type == TRAILING_STOP and (trail_amount is None) == (trail_percent is None):
+            raise ValueError("Trailing stops need exactly one of trail_amount and trail_percent")
+        if order_type == MARKET_ON_CLOSE and self.bar < 0:
+            raise ValueError("Market-on-close orders can only be placed while the engine runs")
+
+        order = Order(len(self.orders), symbol, side, quantity, order_type, limit_price, stop_price,
+                      trail_amount, trail_percent, tag, self.bar)
+        self.orders.append(order)
+        if order_type == MARKET_ON_CLOSE:
+            price = self._closes[symbol][self.bar]
+            if np.isnan(price):
+                order.status = REJECTED
+            else:
+                self._fill(order, self.bar, price)
+            return order
+        if order_type == TRAILING_STOP:
+            # Trail from the close of the submission bar (the first open when placed in on_start)
+            order.extreme = float(self._closes[symbol][self.bar] if self.bar >= 0 else self._books[symbol].open[0])
+        self._books[symbol].add(order)
+        self._changed.add(symbol)
+        return order
+
+    def cancel(self, order: Order) -> bool:
+        """
+        Cancel an open order
+
+        Returns:
+            Whether the order was still open
+        """
+        if not order.is_open:
+            return False
+        order.status = CANCELLED
+        self._books[order.symbol].remove(order)
+        self._changed.add(order.symbol)
+        return True
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[Order]:
+        """Open orders, optionally of one symbol"""
+        return [order for order in self.orders if order.is_open and (symbol is None or order.symbol == symbol)]
+
+    def position(self, symbol: str = '') -> float:
+        """Shares held (negative when short)"""
+        return self.positions[symbol]
+
+    def price(self, symbol: str = '') -> float:
+        """Close of the current bar"""
+        return float(self._closes[symbol][self.bar])
+
+    def equity(self) -> float:
+        """Cash plus the value of all positions at the current close"""
+        value = self.cash
+        for symbol, position in self.positions.items():
+            if position:
+                value += position * self._last_close(symbol)
+        return value
+
+    def _last_close(self, symbol: str) -> float:
+        return float(self._marks[symbol][self.bar]) if self.bar >= 0 else 0.0
+
+    # --- Execution ---
+
+    def _fill(self, order: Order, bar: int, price: float):
+        if order.order_type in (MARKET, MARKET_ON_CLOSE, STOP, TRAILING_STOP):
+            price = price * (1 + self.slippage * order.side)
+        symbol = order.symbol
+        position = self.positions[symbol]
+        if order.side == BUY:
+            if order.quantity is None:
+                quantity = self.cash / (price * (1 + self.commission))
+                value = self.cash
+            else:
+                quantity = order.quantity
+                value = quantity * price * (1 + self.commission)
+            if not quantity > 0 or value > self.cash * (1 + 1e-12):
+                order.status = REJECTED
+                return
+            # Spending all the cash leaves exactly zero, not a rounding residue
+            self.cash = 0.0 if order.quantity is None else self.cash - value
+        else:
+            quantity = order.quantity if order.quantity is not None else position
+            if not quantity > 0 or (not self.allow_short and quantity > position * (1 + 1e-12)):
+                order.status = REJECTED
+                return
+            value = quantity * price * (1 - self.commission)
+            self.cash += value
+        commission = quantity * price * self.commission
+
+        # Average cost of the position; fills reducing it close (part of) a round trip
+        signed = quantity * order.side
+        new_position = position + signed
+        if position == 0 or (position > 0) == (signed > 0):
+            self._average_cost[symbol] = (
+                (self._average_cost[symbol] * abs(position) + price * quantity) / abs(new_position)
+            )
+        else:
+            self._round_trips += 1
+            self._winning_round_trips += int((price - self._average_cost[symbol]) * np.sign(position) > 0)
+            if abs(signed) > abs(position):
+                self._average_cost[symbol] = price
+        self.positions[symbol] = new_position
+
+        order.status = FILLED
+        order.fill_bar = bar
+        order.fill_price = price
+        order.filled_quantity = quantity
+        self._fills.append((bar, self._symbol_ids[symbol], order.id, order.side, quantity, price, value, commission))
+        self._cash_changes.append((bar, self.cash))
+        self._position_changes[symbol].append((bar, new_position))
+        self._changed.add(symbol)
+        if self._strategy is not None:
+            self._strategy.on_fill(self, order)
+
+    def run(self, strategy: EventStrategy, include_series: bool = True) -> 'EngineResult':
+        """
+        Run a strategy over every bar
+
+        Args:
+            strategy: The strategy
+            include_series: Keep the per-bar equity curve in the result
+
+        Returns:
+            EngineResult
+        """
+        self._reset()
+        n_bars = len(self.index)
+        # Wake-up bars of every symbol merged into one time-ordered stream
+        wake_bars, wake_symbols = [], []
+        for k, symbol in enumerate(self.symbols):
+            bars = strategy.wake_bars(symbol, self.data[symbol])
+            if bars is None:
+                bars = np.flatnonzero(~np.isnan(self._closes[symbol]))
+            bars = np.asarray(bars, dtype=np.int64)
+            wake_bars.append(bars)
+            wake_symbols.append(np.full(len(bars), k, dtype=np.int64))
+        wake_bars = np.concatenate(wake_bars)
+        wake_symbols = np.concatenate(wake_symbols)
+        ordering = np.lexsort((wake_symbols, wake_bars))
+        wake_bars = wake_bars[ordering].tolist()
+        wake_symbols = wake_symbols[ordering].tolist()
+
+        # Orders placed in on_start become eligible on the first bar
+        self._strategy = strategy
+        strategy.on_start(self)
+        events = []  # (bar, symbol position, book version)
+        self._schedule(events, 0)
+
+        next_wake = 0
+        n_wakes = len(wake_bars)
+        while True:
+            while events and events[0][2] != self._books[self.symbols[events[0][1]]].version:
+                heapq.heappop(events)
+            bar = events[0][0] if events else n_bars
+            if next_wake < n_wakes and wake_bars[next_wake] < bar:
+                bar = wake_bars[next_wake]
+            if bar >= n_bars:
+                break
+            self.bar = bar
+
+            # Fills happen during the bar, before the strategy sees its close.
+            # Every due order is taken out of its book first, so orders placed
+            # from on_fill cannot fill on the bar they were placed on.
+            due = []
+            while events and events[0][0] == bar:
+                _, k, version = heapq.heappop(events)
+                book = self._books[self.symbols[k]]
+                if version == book.version:
+                    self._changed.add(self.symbols[k])
+                    due.extend(book.triggered(bar))
+            due.sort(key=lambda fill: fill[0].id)
+            for fill_order, price in due:
+                # An earlier fill's on_fill may have cancelled it (one-cancels-other)
+                if fill_order.is_open:
+                    self._fill(fill_order, bar, price)
+            while next_wake < n_wakes and wake_bars[next_wake] == bar:
+                strategy.on_bar(self, self.symbols[wake_symbols[next_wake]], bar)
+                next_wake += 1
+            self._schedule(events, bar + 1)
+
+        result = self._result(strategy, include_series)
+        self._strategy = None
+        return result
+
+    def _schedule(self, events: list, start: int):
+        """Queue the next fill bar of every book changed since the last call"""
+        for symbol in self._changed:
+            book = self._books[symbol]
+            # A new version also invalidates the book's previously queued event
+            book.version += 1
+            bar = book.next_fill_bar(start)
+            if bar < len(self.index):
+                heapq.heappush(events, (bar, self._symbol_ids[symbol], book.version))
+        self._changed = set()
+
+    def _result(self, strategy: EventStrategy, include_series: bool) -> 'EngineResult':
+        n_bars = len(self.index)
+
+        # Cash and positions only change on fills, so the equity curve is
+        # rebuilt from the change points in one vectorized pass
+        def step_series(changes, initial):
+            values = np.full(n_bars, np.nan)
+            if changes:
+                bars, after = (np.array(column) for column in zip(*changes))
+                # Keep the last change on each bar
+                last = len(bars) - 1 - np.unique(bars[::-1], return_index=True)[1]
+                values[bars[last]] = after[last]
+            return pd.Series(values).ffill().fillna(initial).to_numpy()
+
+        equity = step_series(self._cash_changes, float(self.initial_capital))
+        for symbol in self.symbols:
+            if self._position_changes[symbol]:
+                held = step_series(self._position_changes[symbol], 0.0)
+                equity = equity + np.where(held != 0, held * self._marks[symbol], 0.0)
+
+        state = BacktestState(self.initial_capital)
+        closes = self._closes[self.symbols[0]] if len(self.symbols) == 1 else None
+        state.record(self.index, closes, equity)
+        state.total_trades = self._round_trips
+        state.winning_trades = self._winning_round_trips
+        metrics = state.metrics()
+        metrics['total_fills'] = len(self._fills)
+
+        return EngineResult(
+            getattr(strategy, 'name', type(strategy).__name__), metrics,
+            np.array(self._fills, dtype=FILL_DTYPE), list(self.orders), self.symbols, self.index,
+            equity=equity if include_series else None
+        )
+
+
+class EngineResult:
+    """
+    Result of an ``EventEngine`` run
+
+    Like ``BacktestReport``, fills and the equity curve stay NumPy arrays until
+    ``to_dict``. ``metrics`` has the keys of a signal backtest, where a trade
+    is a fill that reduces or closes a position, plus 'total_fills'.
+    """
+
+    __slots__ = ('strategy_name', 'metrics', 'fills', 'orders', 'symbols', 'index', 'equity')
+
+    def __init__(self, strategy_name: str, metrics: Dict[str, Any], fills: np.ndarray, orders: List[Order],
+                 symbols: List[str], index: pd.Index, equity: Optional[np.ndarray] = None):
+        self.strategy_name = strategy_name
+        self.metrics = metrics
+        self.fills = fills
+        self.orders = orders
+        self.symbols = symbols
+        self.index = index
+        self.equity = equity
+
+    def __getitem__(self, key: str):
+        if key == 'strategy_name':
+            return self.strategy_name
+        return self.metrics[key]
+
+    def to_report(self, symbol: Optional[str] = None) -> BacktestReport:
+        """
+        The run as a ``BacktestReport`` with one symbol's fills as its trades
+
+        Lets order-level runs reuse everything built on signal backtests
+        (charts, JSON output, comparisons).
+
+        Args:
+            symbol: Symbol whose fills become the trades (defaults to the first)
+
+        Returns:
+            BacktestReport
+        """
+        position = self.symbols.index(self.symbols[0] if symbol is None else symbol)
+        fills = self.fills[self.fills['symbol'] == position]
+        trades = np.empty(len(fills), dtype=TRADE_DTYPE)
+        trades['bar'] = fills['bar']
+        trades['action'] = fills['side']
+        trades['price'] = fills['price']
+        trades['shares'] = np.where(fills['side'] == BUY, fills['quantity'], 0.0)
+        trades['capital'] = fills['value']
+        return BacktestReport(self.strategy_name, self.metrics, trades, self.index, equity=self.equity)
+
+    def fill_records(self) -> List[Dict[str, Any]]:
+        """Fills as a list of JSON-ready dicts"""
+        dates = format_dates(self.index[self.fills['bar']])
+        return [
+            {'date': date, 'symbol': self.symbols[symbol], 'order_id': order_id,
+             'side': 'BUY' if side == BUY else 'SELL', 'order_type': self.orders[order_id].order_type,
+             'quantity': quantity, 'price': price, 'value': value, 'commission': commission}
+            for date, (_, symbol, order_id, side, quantity, price, value, commission)
+            in zip(dates, self.fills.tolist())
+        ]
+
+    def to_dict(self, include_series: bool = True) -> Dict[str, Any]:
+        """
+        Convert to a JSON-serializable dictionary
+
+        Args:
+            include_series: Include the per-bar 'portfolio_values' and 'dates'
+
+        Returns:
+            Dictionary with metrics, fills and optionally the equity curve
+        """
+        report = self.to_report()
+        results = {'strategy_name': self.strategy_name, **report.summary(), 'fills': self.fill_records()}
+        if include_series and self.equity is not None:
+            results['portfolio_values'] = self.equity.tolist()
+            results['dates'] = report.date_strings()
+        return results
+
+
+class SignalOrderStrategy(EventStrategy):
+    """
+    Runs a signal strategy (``BaseStrategy``) through the ``EventEngine``
+
+    Enters all-in on a buy signal while flat and exits the whole position on
+    a sell signal, like ``BaseStrategy.backtest``, with a choice of entry
+    order and optional protective exits placed once the entry fills. Exits
+    are one-cancels-other: the first to fill cancels the rest.
+
+    With the defaults (market-on-close entries, no exits) the trades, equity
+    curve and metrics match ``BaseStrategy.backtest``.
+
+    Args:
+        strategy: Signal strategy
+        entry: MARKET_ON_CLOSE (fill at the signal bar's close), MARKET (next
+            open) or LIMIT (``limit_offset`` below the signal bar's close)
+        limit_offset: Fraction below the close for LIMIT entries
+        stop_loss: Stop this fraction below the entry price
+        take_profit: Limit sell this fraction above the entry price
+        trailing_stop: Trailing stop this fraction below the highest price
+    """
+
+    def __init__(self, strategy, entry: str = MARKET_ON_CLOSE, limit_offset: float = 0.0,
+                 stop_loss: Optional[float] = None, take_profit: Optional[float] = None,
+                 trailing_stop: Optional[float] = None):
+        if entry not in (MARKET_ON_CLOSE, MARKET, LIMIT):
+            raise ValueError(f"entry must be one of: {MARKET_ON_CLOSE}, {MARKET}, {LIMIT}")
+        for name, value in (('stop_loss', stop_loss), ('take_profit', take_profit), ('trailing_stop', trailing_stop)):
+            if value is not None and not 0 < value < 1:
+                raise ValueError(f"{name} must be a fraction between 0 and 1")
+        self.strategy = strategy
+        self.name = strategy.name
+        self.entry = entry
+        self.limit_offset = limit_offset
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.trailing_stop = trailing_stop
+        self.signals: Dict[str, np.ndarray] = {}
+        self._entries: Dict[str, Order] = {}
+        self._exits: Dict[str, List[Order]] = {}
+
+    def wake_bars(self, symbol: str, data: pd.DataFrame) -> np.ndarray:
+        # Signals only fire on bars the symbol trades
+        traded = data.dropna(subset=['Close'])
+        signals = np.zeros(len(data), dtype=np.int8)
+        signals[np.flatnonzero(data['Close'].notna())] = np.asarray(self.strategy.generate_signals(traded))
+        self.signals[symbol] = signals
+        return np.flatnonzero(signals)
+
+    def on_start(self, engine: EventEngine):
+        self._entries = {}
+        self._exits = {symbol: [] for symbol in engine.symbols}
+
+    def on_bar(self, engine: EventEngine, symbol: str, bar: int):
+        signal = self.signals[symbol][bar]
+        pending = self._entries.get(symbol)
+        if signal == 1 and engine.position(symbol) == 0 and (pending is None or not pending.is_open):
+            if self.entry == LIMIT:
+                limit = engine.price(symbol) * (1 - self.limit_offset)
+                self._entries[symbol] = engine.submit(symbol, BUY, order_type=LIMIT, limit_price=limit, tag='entry')
+            else:
+                self._entries[symbol] = engine.submit(symbol, BUY, order_type=self.entry, tag='entry')
+        elif signal == -1:
+            if pending is not None:
+                engine.cancel(pending)
+            if engine.position(symbol) > 0:
+                self._cancel_exits(engine, symbol)
+                exit_type = MARKET_ON_CLOSE if self.entry == MARKET_ON_CLOSE else MARKET
+                self._exits[symbol].append(engine.submit(symbol, SELL, order_type=exit_type, tag='exit'))
+
+    def on_fill(self, engine: EventEngine, order: Order):
+        symbol = order.symbol
+        if order.side == BUY:
+            price = order.fill_price
+            exits = self._exits[symbol]
+            if self.stop_loss is not None:
+                exits.append(engine.submit(symbol, SELL, order_type=STOP,
+                                           stop_price=price * (1 - self.stop_loss), tag='stop_loss'))
+            if self.take_profit is not None:
+                exits.append(engine.submit(symbol, SELL, order_type=LIMIT,
+                                           limit_price=price * (1 + self.take_profit), tag='take_profit'))
+            if self.trailing_stop is not None:
+                exits.append(engine.submit(symbol, SELL, order_type=TRAILING_STOP,
+                                           trail_percent=self.trailing_stop, tag='trailing_stop'))
+        else:
+            self._cancel_exits(engine, symbol)
+
+    def _cancel_exits(self, engine: EventEngine, symbol: str):
+        for order in self._exits[symbol]:
+            engine.cancel(order)
+        self._exits[symbol] = []
@@ -1,5 +1,7 @@
 import pandas as pd
+from typing import Tuple
 from strategies.base.strategy import BaseStrategy
+from strategies import indicators
 
 class BollingerBandsStrategy(BaseStrategy):
     """
@@ -18,17 +20,22 @@ class BollingerBandsStrategy(BaseStrategy):
             'num_std': num_std
         }
 
-    def generate_signals(self, data: pd.DataFrame) -> pd.Series:
+    @property
+    def lookback(self) -> int:
+        return self.window + 1
+
+    def signal_conditions(self, data) -> Tuple[pd.DataFrame, pd.DataFrame]:
         # Calculate moving average and bands
-        ma = data['Close'].rolling(window=self.window).mean()
-        std = data['Close'].rolling(window=self.window).std()
-        upper_band = ma + self.num_std * std
-        lower_band = ma - self.num_std * std
+        ma, upper_band, lower_band = indicators.bollinger_bands(data, self.window, self.num_std)
 
         # Buy when price crosses below lower band, sell when crosses above upper band
-        signals = pd.Series(0, index=data.index)
         buy_signal = (data['Close'] < lower_band) & (data['Close'].shift(1) >= lower_band.shift(1))
         sell_signal = (data['Close'] > upper_band) & (data['Close'].shift(1) <= upper_band.shift(1))
+        return buy_signal, sell_signal
+
+    def generate_signals(self, data: pd.DataFrame) -> pd.Series:
+        buy_signal, sell_signal = self.signal_conditions(data)
+        signals = pd.Series(0, index=data.index)
         signals[buy_signal] = 1
         signals[sell_signal] = -1
         return signals 
\ No newline at end of file
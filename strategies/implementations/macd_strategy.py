@@ -1,5 +1,8 @@
+import numpy as np
 import pandas as pd
+from typing import Any, Dict, Tuple
 from strategies.base.strategy import BaseStrategy
+from strategies import indicators
 
 class MACDStrategy(BaseStrategy):
     """
@@ -20,17 +23,47 @@ class MACDStrategy(BaseStrategy):
             'signal_period': signal_period
         }
 
-    def generate_signals(self, data: pd.DataFrame) -> pd.Series:
-        # Calculate EMAs
-        ema_fast = data['Close'].ewm(span=self.fast_period, adjust=False).mean()
-        ema_slow = data['Close'].ewm(span=self.slow_period, adjust=False).mean()
-        macd = ema_fast - ema_slow
-        signal = macd.ewm(span=self.signal_period, adjust=False).mean()
+    def signal_conditions(self, data) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        # Calculate MACD and signal line
+        macd, signal = indicators.macd(data, self.fast_period, self.slow_period, self.signal_period)
 
         # Buy when MACD crosses above signal, sell when crosses below
-        signals = pd.Series(0, index=data.index)
         buy_signal = (macd > signal) & (macd.shift(1) <= signal.shift(1))
         sell_signal = (macd < signal) & (macd.shift(1) >= signal.shift(1))
+        return buy_signal, sell_signal
+
+    def signal_state(self, data: pd.DataFrame) -> Dict[str, Any]:
+        # EMAs are recursive, so their last values are all that is needed to continue them
+        macd, signal = indicators.macd(data, self.fast_period, self.slow_period, self.signal_period)
+        return {
+            'ema_fast': float(indicators.ema(data, self.fast_period).iloc[-1]),
+            'ema_slow': float(indicators.ema(data, self.slow_period).iloc[-1]),
+            'macd': float(macd.iloc[-1]),
+            'signal': float(signal.iloc[-1])
+        }
+
+    def extend_signals(self, signal_state: Dict[str, Any], new_data: pd.DataFrame) -> Tuple[np.ndarray, Dict[str, Any]]:
+        closes = new_data['Close'].to_numpy(dtype=float)
+        fast = indicators.continue_ema(signal_state['ema_fast'], closes, self.fast_period)
+        slow = indicators.continue_ema(signal_state['ema_slow'], closes, self.slow_period)
+        macd = fast - slow
+        signal = indicators.continue_ema(signal_state['signal'], macd, self.signal_period)
+        prev_macd = np.concatenate(([signal_state['macd']], macd[:-1]))
+        prev_signal = np.concatenate(([signal_state['signal']], signal[:-1]))
+
+        buy_signal = (macd > signal) & (prev_macd <= prev_signal)
+        sell_signal = (macd < signal) & (prev_macd >= prev_signal)
+        signals = np.where(sell_signal, -1, np.where(buy_signal, 1, 0))
+        return signals, {
+            'ema_fast': float(fast[-1]),
+            'ema_slow': float(slow[-1]),
+            'macd': float(macd[-1]),
+            'signal': float(signal[-1])
+        }
+
+    def generate_signals(self, data: pd.DataFrame) -> pd.Series:
+        buy_signal, sell_signal = self.signal_conditions(data)
+        signals = pd.Series(0, index=data.index)
         signals[buy_signal] = 1
         signals[sell_signal] = -1
         return signals 
\ No newline at end of file
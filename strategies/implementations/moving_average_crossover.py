@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
+from typing import Tuple
 from strategies.base.strategy import BaseStrategy
+from strategies import indicators
 
 class MovingAverageCrossover(BaseStrategy):
     """
@@ -22,6 +24,33 @@ class MovingAverageCrossover(BaseStrategy):
             'long_window': long_window
         }
     
+    @property
+    def lookback(self) -> int:
+        # Both averages on the previous bar, for the crossover check
+        return max(self.short_window, self.long_window) + 1
+    
+    def signal_conditions(self, data) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Buy/sell conditions for the moving average crossover
+        
+        Args:
+            data: DataFrame with OHLCV data, or a batch of price paths
+            
+        Returns:
+            Tuple of boolean (buy, sell) conditions
+        """
+        # Calculate moving averages
+        short_ma = indicators.sma(data, self.short_window)
+        long_ma = indicators.sma(data, self.long_window)
+        
+        # Buy signal: short MA crosses above long MA
+        buy_signal = (short_ma > long_ma) & (short_ma.shift(1) <= long_ma.shift(1))
+        
+        # Sell signal: short MA crosses below long MA
+        sell_signal = (short_ma < long_ma) & (short_ma.shift(1) >= long_ma.shift(1))
+        
+        return buy_signal, sell_signal
+    
     def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
         """
         Generate buy/sell signals based on moving average crossover
@@ -32,19 +61,11 @@ class MovingAverageCrossover(BaseStrategy):
         Returns:
             DataFrame with signals (1 for buy, -1 for sell, 0 for hold)
         """
-        # Calculate moving averages
-        short_ma = data['Close'].rolling(window=self.short_window).mean()
-        long_ma = data['Close'].rolling(window=self.long_window).mean()
+        buy_signal, sell_signal = self.signal_conditions(data)
         
         # Generate signals
         signals = pd.Series(0, index=data.index)
-        
-        # Buy signal: short MA crosses above long MA
-        buy_signal = (short_ma > long_ma) & (short_ma.shift(1) <= long_ma.shift(1))
         signals[buy_signal] = 1
-        
-        # Sell signal: short MA crosses below long MA
-        sell_signal = (short_ma < long_ma) & (short_ma.shift(1) >= long_ma.shift(1))
         signals[sell_signal] = -1
         
         return signals 
\ No newline at end of file
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
+from typing import Tuple
 from strategies.base.strategy import BaseStrategy
+from strategies import indicators
 
 class RSIStrategy(BaseStrategy):
     """
@@ -24,6 +26,11 @@ class RSIStrategy(BaseStrategy):
             'overbought': overbought
         }
     
+    @property
+    def lookback(self) -> int:
+        # RSI on the previous bar needs one extra close for its first price change
+        return self.period + 2
+    
     def calculate_rsi(self, data: pd.DataFrame) -> pd.Series:
         """
         Calculate RSI (Relative Strength Index)
@@ -34,22 +41,28 @@ class RSIStrategy(BaseStrategy):
         Returns:
             Series with RSI values
         """
-        # Calculate price changes
-        delta = data['Close'].diff()
+        return indicators.rsi(data, self.period)
+    
+    def signal_conditions(self, data) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Buy/sell conditions for the RSI strategy
         
-        # Separate gains and losses
-        gains = delta.where(delta > 0, 0)
-        losses = -delta.where(delta < 0, 0)
+        Args:
+            data: DataFrame with OHLCV data, or a batch of price paths
+            
+        Returns:
+            Tuple of boolean (buy, sell) conditions
+        """
+        # Calculate RSI
+        rsi = self.calculate_rsi(data)
         
-        # Calculate average gains and losses
-        avg_gains = gains.rolling(window=self.period).mean()
-        avg_losses = losses.rolling(window=self.period).mean()
+        # Buy signal: RSI crosses above oversold level
+        buy_signal = (rsi > self.oversold) & (rsi.shift(1) <= self.oversold)
         
-        # Calculate RS and RSI
-        rs = avg_gains / avg_losses
-        rsi = 100 - (100 / (1 + rs))
+        # Sell signal: RSI crosses below overbought level
+        sell_signal = (rsi < self.overbought) & (rsi.shift(1) >= self.overbought)
         
-        return rsi
+        return buy_signal, sell_signal
     
     def generate_signals(self, data: pd.DataFrame) -> pd.Series:
         """
@@ -61,18 +74,11 @@ class RSIStrategy(BaseStrategy):
         Returns:
             Series with signals (1 for buy, -1 for sell, 0 for hold)
         """
-        # Calculate RSI
-        rsi = self.calculate_rsi(data)
+        buy_signal, sell_signal = self.signal_conditions(data)
         
         # Generate signals
         signals = pd.Series(0, index=data.index)
-        
-        # Buy signal: RSI crosses above oversold level
-        buy_signal = (rsi > self.oversold) & (rsi.shift(1) <= self.oversold)
         signals[buy_signal] = 1
-        
-        # Sell signal: RSI crosses below overbought level
-        sell_signal = (rsi < self.overbought) & (rsi.shift(1) >= self.overbought)
         signals[sell_signal] = -1
         
         return signals 
\ No newline at end of file
@@ -0,0 +1,408 @@
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, Tuple
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _nbytes(value: Any) -> int:
+    """Approximate memory held by a cached indicator value (index excluded, it is shared)"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=False).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=False))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, tuple):
+        return sum(_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    return 0
+
+
+class _DatasetEntry:
+    """Cached indicators for one dataset"""
+    __slots__ = ('ref', 'values', 'nbytes')
+
+    def __init__(self, data, on_collect: Callable[[int, Any], None]):
+        self.values = OrderedDict()  # key -> (value, nbytes)
+        try:
+            self.ref = weakref.ref(data, lambda ref, key=id(data): on_collect(key, ref))
+            self.nbytes = 0
+        except TypeError:
+            # Not weak-referenceable (e.g. dict batches of price paths): held
+            # strongly, so the dataset's own memory counts against the budget
+            self.ref = lambda: data
+            self.nbytes = _nbytes(data)
+
+    @property
+    def data(self):
+        return self.ref()
+
+
+class IndicatorCache:
+    """
+    Memoizes indicator series per dataset
+
+    Entries are keyed by the identity of the DataFrame passed in plus the
+    indicator name and parameters, so strategies evaluated on the same data
+    object share the indicators they have in common. In practice that is
+    within one request: /compare and parameter sweeps run many strategies
+    over a single fetch. Separate requests do not share entries, even for
+    the same symbol and dates, because ``StockDataService`` hands each one a
+    freshly unpickled DataFrame from the shared cache.
+
+    DataFrames are only referenced weakly: a dataset's indicators are
+    dropped as soon as the DataFrame itself is garbage collected, before its
+    id can be reused. Datasets are treated as immutable once indicators have
+    been computed from them.
+
+    Concurrent misses on the same indicator are computed once: the first
+    thread computes it and the others wait for its result.
+
+    Memory is bounded two ways: at most ``max_datasets`` datasets are kept, and
+    the cached values (plus any dataset the cache has to hold strongly) may
+    not exceed ``max_bytes`` in total. Both evict least
+    recently used datasets first, then the oldest indicators of the dataset
+    currently in use.
+    """
+
+    def __init__(self, max_datasets: int = 16, max_bytes: int = 256 * 1024 * 1024):
+        self.max_datasets = max_datasets
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._datasets = OrderedDict()  # id(data) -> _DatasetEntry
+        self._pending = {}  # (id(data), key) -> Future of an indicator being computed
+        # Re-entrant: a weakly referenced dataset can be collected (running
+        # _forget) on a thread that already holds the lock
+        self._lock = threading.RLock()
+
+    def get_or_compute(self, data: pd.DataFrame, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for ``key`` on ``data``, computing it on a miss
+
+        Args:
+            data: Dataset the indicator is computed from
+            key: Indicator name and parameters, e.g. ('sma', 'Close', 20)
+            compute: Zero-argument callable producing the value
+
+        Returns:
+            The indicator value
+        """
+        with self._lock:
+            entry = self._entry(data, create=False)
+            if entry is not None and key in entry.values:
+                entry.values.move_to_end(key)
+                self.hits += 1
+                return entry.values[key][0]
+            pending = self._pending.get((id(data), key))
+            if pending is None:
+                self.misses += 1
+                future = self._pending[(id(data), key)] = Future()
+            else:
+                self.hits += 1
+
+        if pending is not None:
+            # Another thread is computing this indicator; share its result
+            return pending.result()
+
+        # Compute outside the lock so independent indicators can run concurrently
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._pending[(id(data), key)]
+            future.set_exception(e)
+            raise
+        size = _nbytes(value)
+
+        with self._lock:
+            del self._pending[(id(data), key)]
+            entry = self._entry(data, create=True)
+            entry.values[key] = (value, size)
+            entry.nbytes += size
+            self.nbytes += size
+            self._evict(entry)
+        future.set_result(value)
+        return value
+
+    def _entry(self, data, create: bool):
+        entry = self._datasets.get(id(data))
+        if entry is not None and entry.data is not data:
+            entry = None
+        if entry is None and create:
+            self._drop(id(data))
+            entry = _DatasetEntry(data, self._forget)
+            self._datasets[id(data)] = entry
+            self.nbytes += entry.nbytes
+        if entry is not None:
+            self._datasets.move_to_end(id(data))
+        return entry
+
+    def _forget(self, key: int, ref):
+        """Drop the entry of a dataset that was garbage collected"""
+        with self._lock:
+            entry = self._datasets.get(key)
+            if entry is not None and entry.ref is ref:
+                self._drop(key)
+
+    def _drop(self, key):
+        entry = self._datasets.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry.nbytes
+
+    def _evict(self, current: _DatasetEntry):
+        while len(self._datasets) > self.max_datasets:
+            self._drop(next(iter(self._datasets)))
+        while self.nbytes > self.max_bytes and len(self._datasets) > 1:
+            self._drop(next(iter(self._datasets)))
+        # A single dataset over budget sheds its oldest indicators, never the one just added
+        while self.nbytes > self.max_bytes and len(current.values) > 1:
+            _, (_, size) = current.values.popitem(last=False)
+            current.nbytes -= size
+            self.nbytes -= size
+
+    def stats(self) -> dict:
+        """Cache size and hit/miss counters"""
+        with self._lock:
+            return {
+                'datasets': len(self._datasets),
+                'indicators': sum(len(entry.values) for entry in self._datasets.values()),
+                'nbytes': self.nbytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def discard(self, data):
+        """Drop every indicator cached for ``data``"""
+        with self._lock:
+            entry = self._datasets.get(id(data))
+            if entry is not None and entry.data is data:
+                self._drop(id(data))
+
+    def clear(self):
+        """Drop all cached indicators"""
+        with self._lock:
+            self._datasets.clear()
+            self.nbytes = 0
+
+
+# Create a global instance
+indicator_cache = IndicatorCache()
+
+# Window elements reduced at a time by _window_reduce
+WINDOW_BLOCK_SIZE = 1 << 16
+
+
+def _window_reduce(values, window: int, reducer: Callable[..., np.ndarray]):
+    """
+    Apply ``reducer`` to every full window of ``window`` bars (NaN before that)
+
+    Each window is reduced on its own instead of updating a running total, so
+    the value at a bar depends only on the bars in its window and not on how
+    much history precedes it. Incremental backtests rely on this to recompute
+    indicators from a short tail of bars and get bit-identical values.
+
+    Args:
+        values: Series, or DataFrame with one column per price path
+        window: Window length in bars
+        reducer: NumPy reduction taking an ``axis`` argument
+
+    Returns:
+        Series or DataFrame aligned with ``values``
+    """
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    array = values.to_numpy(dtype=float)
+    result = np.full(array.shape, np.nan)
+    if window <= len(array):
+        windows = sliding_window_view(array, window, axis=0)
+        # Reduce in blocks of rows so temporaries stay cache-sized for wide path batches
+        step = max(1, WINDOW_BLOCK_SIZE // (window * max(1, array[0].size)))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for start in range(0, len(windows), step):
+                result[window - 1 + start:window - 1 + start + step] = reducer(windows[start:start + step], axis=-1)
+    if isinstance(values, pd.DataFrame):
+        return pd.DataFrame(result, index=values.index, columns=values.columns)
+    return pd.Series(result, index=values.index, name=values.name)
+
+
+def _window_mean(values, window: int):
+    return _window_reduce(values, window, np.mean)
+
+
+def _window_std(values, window: int):
+    return _window_reduce(values, window, lambda windows, axis: windows.std(axis=axis, ddof=1))
+
+
+def sma(data: pd.DataFrame, window: int, column: str = 'Close') -> pd.Series:
+    """Simple moving average of ``column`` over ``window`` bars"""
+    return indicator_cache.get_or_compute(
+        data, ('sma', column, window),
+        lambda: _window_mean(data[column], window)
+    )
+
+
+def ema(data: pd.DataFrame, span: int, column: str = 'Close') -> pd.Series:
+    """Exponential moving average of ``column`` (recursive form, ``adjust=False``)"""
+    return indicator_cache.get_or_compute(
+        data, ('ema', column, span),
+        lambda: data[column].ewm(span=span, adjust=False).mean()
+    )
+
+
+def continue_ema(last_value: float, values: np.ndarray, span: int) -> np.ndarray:
+    """
+    Continue an ``ema`` over new values from its last computed value
+
+    The recursion restarts from ``last_value``, so the result is bit-identical
+    to recomputing the EMA over the whole history.
+
+    Args:
+        last_value: EMA value at the bar before ``values``
+        values: New input values
+        span: EMA span
+
+    Returns:
+        EMA values for the new bars
+    """
+    extended = pd.Series(np.concatenate(([last_value], np.asarray(values, dtype=float))))
+    return extended.ewm(span=span, adjust=False).mean().to_numpy()[1:]
+
+
+def rolling_std(data: pd.DataFrame, window: int, column: str = 'Close') -> pd.Series:
+    """Rolling sample standard deviation of ``column`` over ``window`` bars"""
+    return indicator_cache.get_or_compute(
+        data, ('rolling_std', column, window),
+        lambda: _window_std(data[column], window)
+    )
+
+
+def rolling_max(data: pd.DataFrame, window: int, column: str = 'High') -> pd.Series:
+    """Highest value of ``column`` over the last ``window`` bars"""
+    return indicator_cache.get_or_compute(
+        data, ('rolling_max', column, window),
+        lambda: data[column].rolling(window=window).max()
+    )
+
+
+def rolling_min(data: pd.DataFrame, window: int, column: str = 'Low') -> pd.Series:
+    """Lowest value of ``column`` over the last ``window`` bars"""
+    return indicator_cache.get_or_compute(
+        data, ('rolling_min', column, window),
+        lambda: data[column].rolling(window=window).min()
+    )
+
+
+def roc(data: pd.DataFrame, period: int, column: str = 'Close') -> pd.Series:
+    """Rate of change of ``column`` over ``period`` bars, in percent"""
+    return indicator_cache.get_or_compute(
+        data, ('roc', column, period),
+        lambda: data[column].pct_change(periods=period) * 100
+    )
+
+
+def rsi(data: pd.DataFrame, period: int = 14, column: str = 'Close') -> pd.Series:
+    """
+    Relative Strength Index using simple rolling averages of gains and losses
+
+    Args:
+        data: DataFrame with OHLCV data
+        period: Averaging window
+        column: Price column
+
+    Returns:
+        Series with RSI values (0-100)
+    """
+    def compute():
+        delta = data[column].diff()
+        gains = delta.where(delta > 0, 0)
+        losses = -delta.where(delta < 0, 0)
+        avg_gains = _window_mean(gains, period)
+        avg_losses = _window_mean(losses, period)
+        rs = avg_gains / avg_losses
+        return 100 - (100 / (1 + rs))
+
+    return indicator_cache.get_or_compute(data, ('rsi', column, period), compute)
+
+
+def macd(
+    data: pd.DataFrame,
+    fast_period: int = 12,
+    slow_period: int = 26,
+    signal_period: int = 9,
+    column: str = 'Close'
+) -> Tuple[pd.Series, pd.Series]:
+    """
+    MACD line and signal line
+
+    The fast and slow EMAs go through the cache on their own, so they are
+    shared with any other indicator or strategy using the same spans.
+
+    Returns:
+        Tuple of (macd, signal)
+    """
+    def compute():
+        line = ema(data, fast_period, column) - ema(data, slow_period, column)
+        return line, line.ewm(span=signal_period, adjust=False).mean()
+
+    return indicator_cache.get_or_compute(
+        data, ('macd', column, fast_period, slow_period, signal_period), compute
+    )
+
+
+def bollinger_bands(
+    data: pd.DataFrame,
+    window: int = 20,
+    num_std: float = 2.0,
+    column: str = 'Close'
+) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    """
+    Bollinger Bands built from the cached SMA and rolling standard deviation
+
+    Returns:
+        Tuple of (middle, upper, lower)
+    """
+    def compute():
+        middle = sma(data, window, column)
+        std = rolling_std(data, window, column)
+        return middle, middle + num_std * std, middle - num_std * std
+
+    return indicator_cache.get_or_compute(
+        data, ('bollinger_bands', column, window, num_std), compute
+    )
+
+
+def atr(data: pd.DataFrame, period: int = 14) -> pd.Series:
+    """Average True Range over ``period`` bars (simple average of the true range)"""
+    def compute():
+        prev_close = data['Close'].shift(1)
+        true_range = pd.concat([
+            data['High'] - data['Low'],
+            (data['High'] - prev_close).abs(),
+            (data['Low'] - prev_close).abs()
+        ], axis=1).max(axis=1)
+        return _window_mean(true_range, period)
+
+    return indicator_cache.get_or_compute(data, ('atr', period), compute)
+
+
+def stochastic(data: pd.DataFrame, k_period: int = 14, d_period: int = 3) -> Tuple[pd.Series, pd.Series]:
+    """
+    Stochastic oscillator
+
+    Returns:
+        Tuple of (%K, %D)
+    """
+    def compute():
+        lowest = rolling_min(data, k_period, 'Low')
+        highest = rolling_max(data, k_period, 'High')
+        k = (data['Close'] - lowest) / (highest - lowest) * 100
+        return k, _window_mean(k, d_period)
+
+    return indicator_cache.get_or_compute(data, ('stochastic', k_period, d_period), compute)
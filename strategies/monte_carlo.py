@@ -0,0 +1,261 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+import numpy as np
+import pandas as pd
+
+# Paths per work unit. Every chunk gets its own seed derived from the run seed
+# and the chunk number, so results do not depend on the number of workers.
+CHUNK_SIZE = 256
+# Bars per path. A chunk holds several (bars x CHUNK_SIZE) float arrays, so
+# this bounds the memory of every worker to a few hundred MB
+MAX_PATH_BARS = 20000
+PATH_METHODS = ("bootstrap", "gbm")
+METRICS = ("total_return", "max_drawdown", "sharpe_ratio")
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def fit_log_returns(data: pd.DataFrame) -> np.ndarray:
+    """Daily log returns of the close price"""
+    closes = data['Close'].to_numpy(dtype=float)
+    log_returns = np.diff(np.log(closes))
+    return log_returns[np.isfinite(log_returns)]
+
+
+def bootstrap_paths(
+    log_returns: np.ndarray,
+    n_paths: int,
+    n_bars: int,
+    start_price: float,
+    rng: np.random.Generator,
+    block_size: int = 20
+) -> np.ndarray:
+    """
+    Synthetic prices from a circular block bootstrap of historical returns
+
+    Blocks of consecutive returns are resampled to keep short-range
+    autocorrelation and volatility clustering.
+
+    Returns:
+        Price array of shape (n_bars, n_paths)
+    """
+    n_returns = len(log_returns)
+    block_size = max(1, min(block_size, n_returns))
+    n_blocks = -(-(n_bars - 1) // block_size)
+    starts = rng.integers(0, n_returns, size=(n_blocks, 1, n_paths))
+    offsets = np.arange(block_size).reshape(1, block_size, 1)
+    indices = ((starts + offsets) % n_returns).reshape(n_blocks * block_size, n_paths)[:n_bars - 1]
+    return _prices_from_log_returns(log_returns[indices], start_price)
+
+
+def gbm_paths(
+    log_returns: np.ndarray,
+    n_paths: int,
+    n_bars: int,
+    start_price: float,
+    rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Synthetic prices from geometric Brownian motion fitted to historical returns
+
+    Returns:
+        Price array of shape (n_bars, n_paths)
+    """
+    drift = log_returns.mean()
+    volatility = log_returns.std(ddof=1)
+    steps = rng.normal(drift, volatility, size=(n_bars - 1, n_paths))
+    return _prices_from_log_returns(steps, start_price)
+
+
+def _prices_from_log_returns(log_returns: np.ndarray, start_price: float) -> np.ndarray:
+    log_prices = np.empty((log_returns.shape[0] + 1, log_returns.shape[1]))
+    log_prices[0] = np.log(start_price)
+    np.cumsum(log_returns, axis=0, out=log_prices[1:])
+    log_prices[1:] += log_prices[0]
+    return np.exp(log_prices)
+
+
+def backtest_paths(signals: np.ndarray, prices: np.ndarray, initial_capital: float = 10000) -> Dict[str, np.ndarray]:
+    """
+    Vectorized equivalent of BaseStrategy.backtest over many paths
+
+    The position after each bar follows the last buy/sell signal (all-in at the
+    close on a buy, flat on a sell), exactly like the single-path loop.
+
+    Args:
+        signals: int8 array (bars x paths) with 1/-1/0
+        prices: Close prices (bars x paths)
+        initial_capital: Starting capital
+
+    Returns:
+        Dictionary of per-path metric arrays
+    """
+    # Position held at the end of each bar: forward-fill the last buy (1) / sell (0)
+    state = np.where(signals == 1, 1.0, np.where(signals == -1, 0.0, np.nan))
+    state[0] = np.nan_to_num(state[0], nan=0.0)
+    position = pd.DataFrame(state).ffill().to_numpy()
+
+    # Held over bar t if long at the end of bar t-1
+    growth = np.ones_like(prices)
+    growth[1:] = np.where(position[:-1] == 1, prices[1:] / prices[:-1], 1.0)
+    equity = initial_capital * np.cumprod(growth, axis=0)
+
+    running_peak = np.maximum.accumulate(equity, axis=0)
+    max_drawdown = ((equity - running_peak) / running_peak).min(axis=0) * 100
+
+    returns = growth[1:] - 1
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = returns.std(axis=0, ddof=1)
+        sharpe = np.where(std > 0, returns.mean(axis=0) / std * np.sqrt(252), np.nan)
+
+    entries = (position[1:] == 1) & (position[:-1] == 0)
+    return {
+        'total_return': (equity[-1] / initial_capital - 1) * 100,
+        'max_drawdown': max_drawdown,
+        'sharpe_ratio': sharpe,
+        'buy_hold_return': (prices[-1] / prices[0] - 1) * 100,
+        'trades': entries.sum(axis=0) + (position[0] == 1)
+    }
+
+
+def _run_chunk(strategy, method: str, log_returns: np.ndarray, n_paths: int, n_bars: int,
+               start_price: float, block_size: int, initial_capital: float,
+               seed: np.random.SeedSequence) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    if method == "bootstrap":
+        prices = bootstrap_paths(log_returns, n_paths, n_bars, start_price, rng, block_size)
+    else:
+        prices = gbm_paths(log_returns, n_paths, n_bars, start_price, rng)
+
+    signals = strategy.generate_signals_batch(pd.DataFrame(prices))
+    return backtest_paths(signals, prices, initial_capital)
+
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _process_pool(n_jobs: int) -> ProcessPoolExecutor:
+    """
+    Process pool shared by every run in this process
+
+    Starting a pool per run would launch ``n_jobs`` interpreters for every API
+    request; the shared pool starts them once and only grows if a run asks for
+    more workers. Workers are spawned rather than forked, since runs are
+    started from threadpool threads and forking a multi-threaded process can
+    deadlock the child.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers < n_jobs:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = n_jobs
+        return _pool
+
+
+def _reset_pool(pool: ProcessPoolExecutor):
+    """Forget a pool whose worker died, so the next run starts a new one"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+            _pool_workers = 0
+
+
+def _summarize(values: np.ndarray) -> Dict[str, Any]:
+    finite = values[np.isfinite(values)]
+    if not len(finite):
+        return {'mean': None, 'std': None, 'min': None, 'max': None,
+                'percentiles': {str(p): None for p in PERCENTILES}}
+    return {
+        'mean': float(finite.mean()),
+        'std': float(finite.std()),
+        'min': float(finite.min()),
+        'max': float(finite.max()),
+        'percentiles': {str(p): float(v) for p, v in zip(PERCENTILES, np.percentile(finite, PERCENTILES))}
+    }
+
+
+def run_monte_carlo(
+    strategy,
+    data: pd.DataFrame,
+    n_paths: int = 1000,
+    method: str = "bootstrap",
+    n_bars: Optional[int] = None,
+    block_size: int = 20,
+    initial_capital: float = 10000,
+    seed: int = 0,
+    n_jobs: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Run a strategy over many resampled or simulated price paths
+
+    Args:
+        strategy: Strategy instance
+        data: Historical OHLCV data the paths are fitted to
+        n_paths: Number of paths
+        method: 'bootstrap' (block bootstrap of returns) or 'gbm'
+        n_bars: Bars per path (defaults to the length of ``data``, at most MAX_PATH_BARS)
+        block_size: Block length for the bootstrap
+        initial_capital: Starting capital
+        seed: Seed for reproducible paths
+        n_jobs: Worker processes (defaults to the CPU count, 1 runs in-process);
+            runs share one process pool per process
+
+    Returns:
+        Dictionary with the distribution of total return, max drawdown and
+        Sharpe ratio across paths
+    """
+    if method not in PATH_METHODS:
+        raise ValueError(f"Unknown path method '{method}', expected one of {PATH_METHODS}")
+    if n_paths < 1:
+        raise ValueError("n_paths must be at least 1")
+
+    log_returns = fit_log_returns(data)
+    if len(log_returns) < 2:
+        raise ValueError("Not enough price history to fit synthetic paths")
+    n_bars = n_bars or len(data)
+    if n_bars < 2:
+        raise ValueError("Paths need at least 2 bars")
+    if n_bars > MAX_PATH_BARS:
+        raise ValueError(f"Paths are limited to {MAX_PATH_BARS} bars; pass a smaller n_bars")
+    start_price = float(data['Close'].iloc[0])
+
+    chunk_sizes = [min(CHUNK_SIZE, n_paths - start) for start in range(0, n_paths, CHUNK_SIZE)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    args = [
+        (strategy, method, log_returns, size, n_bars, start_price, block_size, initial_capital, chunk_seed)
+        for size, chunk_seed in zip(chunk_sizes, seeds)
+    ]
+
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(args))
+    if n_jobs == 1:
+        chunks = [_run_chunk(*chunk_args) for chunk_args in args]
+    else:
+        pool = _process_pool(n_jobs)
+        try:
+            chunks = list(pool.map(_run_chunk, *zip(*args)))
+        except BrokenProcessPool:
+            _reset_pool(pool)
+            raise
+
+    results = {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+    distribution = {key: _summarize(results[key].astype(float)) for key in METRICS}
+    distribution['probability_of_loss'] = float((results['total_return'] < 0).mean() * 100)
+    distribution['beats_buy_hold'] = float((results['total_return'] > results['buy_hold_return']).mean() * 100)
+    distribution['mean_trades'] = float(results['trades'].mean())
+
+    return {
+        'strategy_name': strategy.name,
+        'method': method,
+        'n_paths': n_paths,
+        'n_bars': n_bars,
+        'seed': seed,
+        'distribution': distribution
+    }
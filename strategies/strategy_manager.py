@@ -2,11 +2,23 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from typing import Dict, List, Any
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
 from strategies.implementations.moving_average_crossover import MovingAverageCrossover
 from strategies.implementations.rsi_strategy import RSIStrategy
 from strategies.implementations.macd_strategy import MACDStrategy
 from strategies.implementations.bollinger_bands_strategy import BollingerBandsStrategy
+from strategies.dsl import strategy_from_spec
+
+# Metrics reported per strategy in a comparison table
+COMPARISON_METRICS = [
+    'final_capital', 'total_return', 'buy_hold_return', 'win_rate', 'max_drawdown', 'total_trades',
+    'sharpe_ratio', 'volatility', 'sortino_ratio', 'calmar_ratio'
+]
+
+# Upper bound on parameter combinations evaluated by one sweep
+MAX_SWEEP_COMBINATIONS = 500
 
 class StrategyManager:
     """Manages all available trading strategies"""
@@ -47,7 +59,36 @@ class StrategyManager:
         
         return self.strategies[strategy_id]
     
-    def run_backtest(self, strategy_id: str, data, initial_capital: float = 10000, **parameters):
+    def create_strategy(self, strategy_id: str, **parameters):
+        """
+        Create a fresh instance of a strategy with the given parameters
+
+        The registered instances only describe the defaults; backtests run on
+        their own instance so concurrent requests never share parameter state.
+
+        Args:
+            strategy_id: ID of the strategy to create
+            **parameters: Strategy-specific parameters overriding the defaults
+
+        Returns:
+            New strategy instance
+        """
+        return self.get_strategy(strategy_id).clone(**parameters)
+    
+    def strategy_from_config(self, config: Dict[str, Any]):
+        """
+        Build a strategy from a {'strategy_id' or 'spec', 'parameters'} dict
+        
+        Returns:
+            Tuple of (strategy_id, strategy), with 'composite' as the id for specs
+        """
+        parameters = config.get('parameters') or {}
+        if config.get('spec'):
+            return 'composite', strategy_from_spec(config['spec']).clone(**parameters)
+        return config['strategy_id'], self.create_strategy(config['strategy_id'], **parameters)
+    
+    def run_backtest(self, strategy_id: str, data, initial_capital: float = 10000,
+                     include_series: bool = True, **parameters):
         """
         Run backtest for a specific strategy
         
@@ -55,19 +96,122 @@ class StrategyManager:
             strategy_id: ID of the strategy to run
             data: Historical price data
             initial_capital: Starting capital
+            include_series: Keep the per-bar equity curve (False for summary-only)
             **parameters: Strategy-specific parameters
             
         Returns:
-            Backtest results
+            BacktestReport
         """
-        strategy = self.get_strategy(strategy_id)
-        
-        # Update strategy parameters if provided
-        if parameters:
-            strategy.set_parameters(parameters)
+        strategy = self.create_strategy(strategy_id, **parameters)
         
         # Run backtest
-        return strategy.backtest(data, initial_capital)
+        return strategy.backtest(data, initial_capital, include_series)
+    
+    def compare_strategies(
+        self,
+        configs: List[Dict[str, Any]],
+        data,
+        initial_capital: float = 10000,
+        max_workers: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Backtest several strategies on the same data in parallel
+        
+        All runs share the one DataFrame, so indicators they have in common
+        (e.g. a 20-bar SMA) are computed once through the indicator cache.
+        
+        Args:
+            configs: List of {'strategy_id' or 'spec', 'parameters', optional 'label'}
+                dicts, where 'spec' is a composite strategy spec
+            data: Historical price data
+            initial_capital: Starting capital
+            max_workers: Maximum number of worker threads
+            
+        Returns:
+            Dictionary with shared dates, per-strategy equity curves (NumPy
+            arrays) and trades, and a metrics table
+        """
+        if not configs:
+            raise ValueError("At least one strategy is required for a comparison")
+        
+        # Build every strategy up front so bad ids/parameters/rules fail before any work starts
+        labels = []
+        runs = []
+        for config in configs:
+            strategy_id, strategy = self.strategy_from_config(config)
+            base_label = config.get('label') or (strategy.name if strategy_id == 'composite' else strategy_id)
+            label = base_label
+            suffix = 2
+            while label in labels:
+                label = f"{base_label} #{suffix}"
+                suffix += 1
+            labels.append(label)
+            runs.append((label, strategy_id, strategy))
+        
+        results = self._run_parallel([run[2] for run in runs], data, initial_capital, max_workers)
+        
+        return {
+            'dates': results[0].date_strings(),
+            'equity': {label: result.equity for label, result in zip(labels, results)},
+            'trades': {label: result.trade_records() for label, result in zip(labels, results)},
+            'metrics': [
+                self._metrics_row(label, strategy_id, strategy, result)
+                for (label, strategy_id, strategy), result in zip(runs, results)
+            ]
+        }
+    
+    def sweep_strategy(
+        self,
+        config: Dict[str, Any],
+        grid: Dict[str, List[Any]],
+        data,
+        initial_capital: float = 10000,
+        max_workers: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Backtest every parameter combination of a grid on the same data
+        
+        Args:
+            config: {'strategy_id' or 'spec', 'parameters'} dict giving the base strategy
+            grid: Mapping of parameter name to the values to try
+            data: Historical price data
+            initial_capital: Starting capital
+            max_workers: Maximum number of worker threads
+            
+        Returns:
+            Metrics table with one row per combination
+        """
+        names = list(grid)
+        combinations = list(itertools.product(*(grid[name] for name in names)))
+        if len(combinations) > MAX_SWEEP_COMBINATIONS:
+            raise ValueError(f"Sweep has {len(combinations)} combinations, the limit is {MAX_SWEEP_COMBINATIONS}")
+        
+        strategy_id, strategy = self.strategy_from_config(config)
+        strategies = [strategy.clone(**dict(zip(names, values))) for values in combinations]
+        results = self._run_parallel(strategies, data, initial_capital, max_workers, include_series=False)
+        
+        return [
+            self._metrics_row(
+                ", ".join(f"{name}={value}" for name, value in zip(names, values)),
+                strategy_id, swept, result
+            )
+            for values, swept, result in zip(combinations, strategies, results)
+        ]
+    
+    def _run_parallel(self, strategies: List[Any], data, initial_capital: float,
+                      max_workers: Optional[int] = None, include_series: bool = True):
+        """Backtest strategies on shared data in a thread pool, preserving order"""
+        with ThreadPoolExecutor(max_workers=max_workers or min(len(strategies), 8)) as executor:
+            return list(executor.map(
+                lambda strategy: strategy.backtest(data, initial_capital, include_series), strategies
+            ))
+    
+    def _metrics_row(self, label: str, strategy_id: Optional[str], strategy, result) -> Dict[str, Any]:
+        summary = result.summary()
+        row = {'label': label, 'strategy_id': strategy_id, 'strategy_name': strategy.name,
+               'parameters': strategy.get_parameters()}
+        row.update({key: summary[key] for key in COMPARISON_METRICS})
+        return row
 
 # Create global instance
 strategy_manager = StrategyManager() 
\ No newline at end of file
@@ -2,8 +2,10 @@ import sys
 import os
 sys.path.append(os.path.dirname(__file__))
 
-from backend.main import app
+from config.settings import settings
 import uvicorn
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    # An import string (not the app object) lets uvicorn run several worker
+    # processes; set WEB_CONCURRENCY to choose how many
+    uvicorn.run("backend.main:app", host="0.0.0.0", port=8000, workers=settings.API_WORKERS)
\ No newline at end of file
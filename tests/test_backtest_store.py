@@ -0,0 +1,91 @@
+"""Stored backtests extend incrementally unless the price history was adjusted"""
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.models.base import Base
+from backend.services.backtest_store import BacktestStore
+from backend.services.offline_data import synthetic_history
+from strategies.strategy_manager import strategy_manager
+
+
+class FakeDataService:
+    """Serves slices of one fixed history, optionally back-adjusted by a factor"""
+
+    def __init__(self, history: pd.DataFrame):
+        self.history = history
+        self.requests = []
+
+    def adjust(self, ex_date: str, factor: float):
+        # A dividend or split: yfinance's auto_adjust rescales every bar before the ex-date
+        self.history = self.history.copy()
+        before = self.history.index < pd.Timestamp(ex_date, tz=self.history.index.tz)
+        self.history.loc[before, ['Open', 'High', 'Low', 'Close']] *= factor
+
+    def get_stock_data(self, symbol, start_date, end_date):
+        self.requests.append(start_date)
+        index = self.history.index
+        mask = (index >= pd.Timestamp(start_date, tz=index.tz)) & (index < pd.Timestamp(end_date, tz=index.tz))
+        return self.history[mask]
+
+
+@pytest.fixture
+def store(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'store.db'}")
+    Base.metadata.create_all(bind=engine)
+    store = BacktestStore(session_factory=sessionmaker(bind=engine), data_service=None)
+    store._tables_ready = True
+    return store
+
+
+def run(store, data_service, end_date):
+    store.data_service = data_service
+    strategy = strategy_manager.create_strategy("moving_average_crossover")
+    report = strategy.backtest(data_service.get_stock_data("AAPL", "2015-01-01", end_date), include_series=False)
+    return store.save("AAPL", "2015-01-01", {"strategy_id": "moving_average_crossover", "parameters": {}}, report)
+
+
+def full_rerun(data_service, end_date):
+    strategy = strategy_manager.create_strategy("moving_average_crossover")
+    return strategy.backtest(data_service.get_stock_data("AAPL", "2015-01-01", end_date)).summary()
+
+
+def test_extend_continues_from_the_checkpoint(store):
+    data_service = FakeDataService(synthetic_history("AAPL", "2015-01-01", "2021-01-01"))
+    backtest_id = run(store, data_service, "2020-01-01")
+    data_service.requests.clear()
+
+    extended = store.extend(backtest_id, "2021-01-01")
+    assert len(data_service.requests) == 1 and data_service.requests[0] != "2015-01-01"
+    assert extended['new_bars'] > 0
+    assert np.isclose(extended['results']['total_return'], full_rerun(data_service, "2021-01-01")['total_return'])
+
+
+def test_adjusted_history_falls_back_to_a_full_rerun(store):
+    data_service = FakeDataService(synthetic_history("AAPL", "2015-01-01", "2021-01-01"))
+    backtest_id = run(store, data_service, "2020-01-01")
+    data_service.adjust("2020-06-01", 0.9)
+    data_service.requests.clear()
+
+    extended = store.extend(backtest_id, "2021-01-01")
+    assert data_service.requests[-1] == "2015-01-01"
+    expected = full_rerun(data_service, "2021-01-01")
+    assert extended['results']['buy_hold_return'] == pytest.approx(expected['buy_hold_return'])
+    assert extended['results']['total_return'] == pytest.approx(expected['total_return'])
+    assert extended['n_bars'] == len(data_service.get_stock_data("AAPL", "2015-01-01", "2021-01-01"))
+
+
+def test_rerun_without_new_bars_moves_the_checkpoint(store):
+    data_service = FakeDataService(synthetic_history("AAPL", "2015-01-01", "2020-01-01"))
+    backtest_id = run(store, data_service, "2020-01-01")
+    data_service.adjust("2020-06-01", 0.9)
+
+    data_service.requests.clear()
+    assert store.extend(backtest_id, "2020-01-01")['new_bars'] == 0
+    assert data_service.requests[-1] == "2015-01-01"
+
+    # The checkpoint now holds the adjusted close, so the next extension is incremental again
+    data_service.requests.clear()
+    store.extend(backtest_id, "2020-01-01")
+    assert data_service.requests == ["2019-12-31"]
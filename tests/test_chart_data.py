@@ -0,0 +1,53 @@
+"""LTTB downsampling picks the same points as the textbook vectorized version"""
+import warnings
+import numpy as np
+import pytest
+from backend.services.chart_data import lttb_indices
+
+
+def reference_lttb(y, n_out):
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    x = np.arange(n, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    prev = 0
+    for b in range(n_out - 2):
+        start, end = edges[b], edges[b + 1]
+        if b + 2 < len(edges):
+            next_start, next_end = edges[b + 1], edges[b + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # All-NaN buckets
+            avg_y = np.nanmean(y[next_start:next_end])
+        areas = np.abs((x[prev] - avg_x) * (y[start:end] - y[prev]) - (x[prev] - x[start:end]) * (avg_y - y[prev]))
+        prev = start + int(np.nanargmax(areas)) if not np.all(np.isnan(areas)) else start
+        selected[b + 1] = prev
+    return selected
+
+
+@pytest.mark.parametrize("n, n_out", [(10, 20), (10, 2), (1000, 3), (6500, 500), (20000, 997)])
+@pytest.mark.parametrize("seed", range(3))
+def test_matches_reference(n, n_out, seed):
+    rng = np.random.default_rng(seed)
+    y = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    # Indicator series start with NaNs and may have gaps
+    y[:min(50, n // 2)] = np.nan
+    y[rng.choice(n, n // 20, replace=False)] = np.nan
+    assert np.array_equal(lttb_indices(y, n_out), reference_lttb(y, n_out))
+
+
+def test_keeps_endpoints_and_extremes():
+    y = np.zeros(1000)
+    y[321] = 5.0
+    y[777] = -5.0
+    selected = lttb_indices(y, 50)
+    assert selected[0] == 0 and selected[-1] == 999
+    assert {321, 777} <= set(selected.tolist())
+    assert np.all(np.diff(selected) > 0)
@@ -0,0 +1,105 @@
+"""Composite strategy rules are validated when they are compiled"""
+import json
+import pytest
+from backend.services.offline_data import synthetic_history
+from strategies.dsl import RuleSyntaxError, compile_rules, strategy_from_spec
+
+
+@pytest.mark.parametrize("rule", [
+    "SMA(20)",
+    "CLOSE - SMA(20)",
+    "$level",
+    "SMA(20) AND RSI(14) < 70",
+    "RSI(14) < 30 OR BB(20, 2).lower",
+    "NOT CLOSE",
+])
+def test_rules_must_be_conditions(rule):
+    with pytest.raises(RuleSyntaxError, match="not a condition"):
+        compile_rules(rule, "RSI(14) > 70", {"level": 50})
+
+
+@pytest.mark.parametrize("rule", [
+    "(SMA(20) > SMA(50))",
+    "NOT (CLOSE < SMA(20)) AND RSI(14) < $level",
+    "SMA(10) crosses above SMA(30) OR CLOSE > BB(20, 2).upper",
+    "1 < 2",
+])
+def test_conditions_compile(rule):
+    rules = compile_rules(rule, "RSI(14) > 70", {"level": 50})
+    buy, sell = rules.evaluate(synthetic_history("AAPL", "2020-01-01", "2021-01-01"))
+    assert buy.dtype == bool and sell.dtype == bool
+
+
+def test_yaml_spec_with_non_boolean_rule_is_rejected():
+    with pytest.raises(RuleSyntaxError, match="SMA is a value"):
+        strategy_from_spec("buy: SMA(20)\nsell: RSI(14) > 70\n")
+
+
+@pytest.mark.parametrize("parameters", [
+    "parameters: {fast: [10, 20], slow: 50}",
+    "parameters: {fast: {value: 10}, slow: 50}",
+    "parameters: {fast: ten, slow: 50}",
+    "parameters: [10, 50]",
+])
+def test_parameters_must_be_numbers(parameters):
+    spec = f"buy: SMA($fast) > SMA($slow)\nsell: SMA($fast) < SMA($slow)\n{parameters}\n"
+    with pytest.raises(RuleSyntaxError, match="[Pp]arameter"):
+        strategy_from_spec(spec)
+
+
+def test_numeric_parameters_are_substituted():
+    strategy = strategy_from_spec(
+        "buy: SMA($fast) > SMA($slow)\nsell: SMA($fast) < SMA($slow)\nparameters: {fast: 10, slow: 30.0}\n"
+    )
+    assert strategy.lookback == 31
+    assert strategy.clone(fast=5).backtest(synthetic_history("AAPL", "2020-01-01", "2021-01-01"))
+
+
+@pytest.mark.parametrize("rule, holds", [
+    ("NOT (1 < 2)", False),
+    ("NOT (1 > 2)", True),
+    ("NOT NOT (1 < 2)", True),
+    ("NOT (1 < 2) OR CLOSE < 0", False),
+    ("NOT (1 > 2) AND CLOSE > 0", True),
+])
+def test_not_negates_constant_conditions(rule, holds):
+    data = synthetic_history("AAPL", "2020-01-01", "2021-01-01")
+    buy, _ = compile_rules(rule, "CLOSE < 0").evaluate(data)
+    assert buy.dtype == bool
+    assert (buy == holds).all()
+
+
+def test_negated_constant_rule_never_trades():
+    data = synthetic_history("AAPL", "2020-01-01", "2021-01-01")
+    never = strategy_from_spec({"buy": "NOT (1 < 2)", "sell": "CLOSE < 0"}).backtest(data)
+    always = strategy_from_spec({"buy": "1 < 2", "sell": "CLOSE < 0"}).backtest(data)
+    assert never["total_trades"] == 0 and len(never.trades) == 0
+    assert len(always.trades) == 1
+
+
+@pytest.mark.parametrize("rule, parameters, message", [
+    ("CLOSE > SMA(2.5)", {}, "SMA window 2.5"),
+    ("CLOSE > SMA(0)", {}, "SMA window 0"),
+    ("CLOSE > SMA($w)", {"w": 2.5}, r"SMA window \$w = 2.5"),
+    ("CLOSE > SMA($w)", {"w": 0}, r"SMA window \$w = 0"),
+    ("MACD(12, 26, 9.5) > 0", {}, "MACD window 9.5"),
+    ("CLOSE > BB(20.5, 2).upper", {}, "BB window 20.5"),
+])
+def test_windows_must_be_whole_bars(rule, parameters, message):
+    with pytest.raises(RuleSyntaxError, match=message):
+        compile_rules(rule, "CLOSE < 0", parameters)
+
+
+def test_non_window_arguments_may_be_fractional():
+    rules = compile_rules("CLOSE > BB($w, 2.5).upper", "CLOSE < SMA(20) * $k", {"w": 20.0, "k": 0.95})
+    buy, sell = rules.evaluate(synthetic_history("AAPL", "2020-01-01", "2021-01-01"))
+    assert buy.dtype == bool and sell.dtype == bool
+
+
+@pytest.mark.parametrize("value", [True, False])
+def test_boolean_parameters_are_rejected(value):
+    with pytest.raises(RuleSyntaxError, match="Parameter 'w' must be a number"):
+        compile_rules("CLOSE > SMA($w)", "CLOSE < 0", {"w": value})
+    spec = {"buy": "CLOSE > SMA($w)", "sell": "CLOSE < 0", "parameters": {"w": value}}
+    with pytest.raises(RuleSyntaxError, match="Parameter 'w' must be a number"):
+        strategy_from_spec(json.dumps(spec))
@@ -0,0 +1,30 @@
+"""API endpoints stay responsive while other requests block"""
+import threading
+import time
+from fastapi.testclient import TestClient
+from backend import main
+from backend.services.offline_data import synthetic_history
+
+
+def test_health_answers_while_a_data_request_waits(monkeypatch):
+    release = threading.Event()
+
+    def slow_get_stock_data(symbol, start_date, end_date):
+        # Stands in for a rate-limit wait, retry backoff or another worker's cache fill
+        release.wait(10)
+        return synthetic_history(symbol, start_date, end_date)
+
+    monkeypatch.setattr(main.stock_data_service, "get_stock_data", slow_get_stock_data)
+    with TestClient(main.app) as client:
+        responses = []
+        thread = threading.Thread(target=lambda: responses.append(
+            client.get("/stock/AAPL/data", params={"start_date": "2020-01-01", "end_date": "2020-02-01"})
+        ))
+        thread.start()
+        time.sleep(0.2)
+        started = time.monotonic()
+        assert client.get("/health").status_code == 200
+        assert time.monotonic() - started < 2
+        release.set()
+        thread.join()
+    assert responses[0].status_code == 200
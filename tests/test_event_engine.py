@@ -0,0 +1,191 @@
+"""
+EventEngine against a naive reference that steps through every bar and
+checks every open order, and against BaseStrategy.backtest for signal
+strategies
+"""
+import numpy as np
+import pytest
+from backend.services.offline_data import synthetic_history
+from strategies.event_engine import (
+    BUY, LIMIT, MARKET, MARKET_ON_CLOSE, ORDER_TYPES, SELL, STOP, TRAILING_STOP,
+    EventEngine, EventStrategy, SignalOrderStrategy
+)
+from strategies.strategy_manager import strategy_manager
+
+
+class NaiveEngine(EventEngine):
+    """Reference engine: every bar, every open order, every close rescanned"""
+
+    def run(self, strategy, include_series=True):
+        self._reset()
+        wakes = {}
+        for symbol in self.symbols:
+            bars = strategy.wake_bars(symbol, self.data[symbol])
+            if bars is None:
+                bars = np.flatnonzero(~np.isnan(self._closes[symbol]))
+            for bar in bars:
+                wakes.setdefault(int(bar), []).append(symbol)
+
+        self._strategy = strategy
+        strategy.on_start(self)
+        for bar in range(len(self.index)):
+            self.bar = bar
+            due = [(order, price) for order in self.orders if (price := self._fill_price(order, bar)) is not None]
+            for order, price in sorted(due, key=lambda fill: fill[0].id):
+                if order.is_open:
+                    self._books[order.symbol].trailing.pop(order.id, None)
+                    self._fill(order, bar, price)
+            for symbol in wakes.get(bar, []):
+                strategy.on_bar(self, symbol, bar)
+        result = self._result(strategy, include_series)
+        self._strategy = None
+        return result
+
+    def _fill_price(self, order, bar):
+        if not order.is_open or order.submitted_bar >= bar:
+            return None
+        open_, high, low, _ = (prices[bar] for prices in self._prices[order.symbol])
+        if order.order_type == MARKET:
+            return None if np.isnan(open_) else open_
+        if order.order_type == LIMIT:
+            level = order.limit_price
+            touched = low <= level if order.side == BUY else high >= level
+        elif order.order_type == STOP:
+            level = order.stop_price
+            touched = high >= level if order.side == BUY else low <= level
+        else:
+            prices = self._prices[order.symbol]
+            start = order.submitted_bar
+            initial = self._closes[order.symbol][start] if start >= 0 else prices[0][0]
+            if order.side == SELL:
+                level = order.trailing_level(np.fmax.reduce(np.concatenate(([initial], prices[1][start + 1:bar]))))
+                touched = low <= level
+            else:
+                level = order.trailing_level(np.fmin.reduce(np.concatenate(([initial], prices[2][start + 1:bar]))))
+                touched = high >= level
+        if not touched:
+            return None
+        # Gaps through the level fill at the open
+        if order.order_type == LIMIT:
+            return min(open_, level) if order.side == BUY else max(open_, level)
+        return max(open_, level) if order.side == BUY else min(open_, level)
+
+    def _last_close(self, symbol):
+        closes = self._closes[symbol][:self.bar + 1]
+        valid = np.flatnonzero(~np.isnan(closes))
+        return float(closes[valid[-1]]) if len(valid) else 0.0
+
+
+class RandomOrders(EventStrategy):
+    """Submits and cancels random orders of every type, sized partly from equity"""
+
+    def __init__(self, seed, every_bar):
+        self.seed = seed
+        self.every_bar = every_bar
+
+    def wake_bars(self, symbol, data):
+        if self.every_bar:
+            return None
+        rng = np.random.default_rng([self.seed, ord(symbol)])
+        valid = np.flatnonzero(data['Close'].notna())
+        return np.sort(rng.choice(valid, size=len(valid) // 7, replace=False))
+
+    def on_start(self, engine):
+        self.rng = np.random.default_rng(self.seed)
+
+    def on_bar(self, engine, symbol, bar):
+        rng = self.rng
+        open_orders = engine.open_orders(symbol)
+        if open_orders and rng.random() < 0.2:
+            engine.cancel(open_orders[int(rng.integers(len(open_orders)))])
+        price = engine.price(symbol)
+        side = int(rng.choice([BUY, SELL]))
+        order_type = rng.choice(ORDER_TYPES)
+        sizing = rng.random()
+        if sizing < 0.3:
+            quantity = None
+        elif sizing < 0.6:
+            # Marks every open position, including symbols missing on this bar
+            equity = engine.equity()
+            quantity = equity * 0.05 / price if equity > 0 else 1.0
+        else:
+            quantity = float(rng.integers(1, 5))
+        kwargs = {}
+        if order_type == LIMIT:
+            kwargs['limit_price'] = price * (1 + rng.normal(0, 0.03))
+        elif order_type == STOP:
+            kwargs['stop_price'] = price * (1 + rng.normal(0, 0.03))
+        elif order_type == TRAILING_STOP:
+            if rng.random() < 0.5:
+                kwargs['trail_percent'] = float(rng.uniform(0.01, 0.08))
+            else:
+                kwargs['trail_amount'] = float(price * rng.uniform(0.01, 0.08))
+        engine.submit(symbol, side, quantity, order_type, **kwargs)
+
+    def on_fill(self, engine, order):
+        if self.rng.random() < 0.3:
+            engine.submit(order.symbol, -order.side, order.filled_quantity,
+                          STOP if self.rng.random() < 0.5 else TRAILING_STOP,
+                          stop_price=order.fill_price * (1 - 0.02 * order.side), trail_percent=0.03)
+
+
+def random_universe(seed):
+    # B and C miss some bars, so the engine timeline has gaps for them
+    data = {}
+    for k, symbol in enumerate("ABC"):
+        frame = synthetic_history(f"{symbol}{seed}", "2000-01-01", "2003-01-01")
+        if k:
+            dropped = np.random.default_rng([seed, k]).choice(len(frame), 60, replace=False)
+            frame = frame.drop(frame.index[dropped])
+        data[symbol] = frame
+    return data
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("allow_short", [False, True])
+@pytest.mark.parametrize("every_bar", [False, True])
+def test_matches_naive_reference(seed, allow_short, every_bar):
+    data = random_universe(seed)
+    options = dict(initial_capital=1000, commission=0.001, slippage=0.0002, allow_short=allow_short)
+    result = EventEngine(data, **options).run(RandomOrders(seed, every_bar))
+    expected = NaiveEngine(data, **options).run(RandomOrders(seed, every_bar))
+    assert len(result.fills) > 50
+    assert np.array_equal(result.fills, expected.fills)
+    assert np.array_equal(result.equity, expected.equity, equal_nan=True)
+
+
+@pytest.mark.parametrize("strategy_id", [
+    'moving_average_crossover', 'rsi_strategy', 'macd_strategy', 'bollinger_bands_strategy'
+])
+def test_signal_strategies_match_the_vectorized_backtest(strategy_id):
+    data = synthetic_history("AAPL", "2000-01-01", "2012-01-01")
+    strategy = strategy_manager.create_strategy(strategy_id)
+    report = strategy.backtest(data)
+    result = EventEngine(data).run(SignalOrderStrategy(strategy, entry=MARKET_ON_CLOSE))
+    assert np.array_equal(result.equity, report.equity)
+    assert np.array_equal(result.to_report().trades, report.trades)
+    metrics = {key: value for key, value in result.metrics.items() if key != 'total_fills'}
+    assert metrics.keys() == report.metrics.keys()
+    for key, value in report.metrics.items():
+        assert value == metrics[key] or (np.isnan(value) and np.isnan(metrics[key]))
+
+
+def test_equity_marks_missing_bars_at_the_last_close():
+    data = synthetic_history("AAPL", "2020-01-01", "2020-03-01")
+    gappy = data.drop(data.index[10:15])
+    marks = []
+
+    class BuyAndWatch(EventStrategy):
+        def wake_bars(self, symbol, frame):
+            return np.arange(len(frame)) if symbol == 'A' else np.array([], dtype=int)
+
+        def on_bar(self, engine, symbol, bar):
+            if bar == 0:
+                engine.submit('B', BUY, 10, MARKET_ON_CLOSE)
+            marks.append(engine.equity())
+
+    engine = EventEngine({'A': data, 'B': gappy})
+    engine.run(BuyAndWatch())
+    closes = gappy['Close'].reindex(data.index).ffill().to_numpy()
+    cash = 10000 - 10 * closes[0]
+    assert np.allclose(marks[1:], (cash + 10 * closes)[1:])
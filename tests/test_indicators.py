@@ -0,0 +1,73 @@
+"""Indicator cache behaviour"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+from strategies.indicators import IndicatorCache
+
+
+def make_data(n_bars: int = 100) -> pd.DataFrame:
+    closes = np.linspace(100, 200, n_bars)
+    return pd.DataFrame({'Open': closes, 'High': closes, 'Low': closes, 'Close': closes})
+
+
+def test_concurrent_misses_compute_once():
+    cache = IndicatorCache()
+    data = make_data()
+    calls = []
+
+    def compute():
+        calls.append(threading.get_ident())
+        time.sleep(0.1)
+        return data['Close'].rolling(20).mean()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        values = list(executor.map(lambda _: cache.get_or_compute(data, ('sma', 'Close', 20), compute), range(8)))
+    assert len(calls) == 1
+    assert all(value is values[0] for value in values)
+    assert cache.stats()['misses'] == 1
+
+
+def test_failed_computation_is_not_cached():
+    cache = IndicatorCache()
+    data = make_data()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.05)
+        raise ValueError("bad window")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(cache.get_or_compute, data, ('sma', 'Close', 0), failing)
+        started.wait()
+        waiter = executor.submit(cache.get_or_compute, data, ('sma', 'Close', 0), lambda: 1)
+        for future in (first, waiter):
+            with pytest.raises(ValueError):
+                future.result()
+    assert cache.get_or_compute(data, ('sma', 'Close', 0), lambda: 2) == 2
+
+
+def test_entries_are_dropped_with_their_dataset():
+    cache = IndicatorCache()
+    data = make_data()
+    cache.get_or_compute(data, ('sma', 'Close', 20), lambda: data['Close'].rolling(20).mean())
+    assert cache.stats()['datasets'] == 1
+    del data
+    assert cache.stats() == {'datasets': 0, 'indicators': 0, 'nbytes': 0, 'hits': 0, 'misses': 1}
+
+
+def test_strongly_held_datasets_count_against_the_budget():
+    cache = IndicatorCache(max_bytes=5_000)
+    frame = pd.DataFrame(np.ones((100, 4)))
+    batch = {'Close': frame}  # dicts cannot be weakly referenced
+    cache.get_or_compute(batch, ('sma', 'Close', 20), lambda: np.zeros(10))
+    assert cache.stats()['nbytes'] == frame.memory_usage(index=False).sum() + 80
+
+    # A second batch pushes the first one out
+    other = {'Close': frame.copy()}
+    cache.get_or_compute(other, ('sma', 'Close', 20), lambda: np.zeros(10))
+    assert cache.stats()['datasets'] == 1
+    assert cache.stats()['nbytes'] <= 5_000
@@ -0,0 +1,64 @@
+"""Monte Carlo robustness runs: limits and the shared process pool"""
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from backend import main
+from backend.services.offline_data import synthetic_history
+from strategies import monte_carlo
+from strategies.base.strategy import BaseStrategy
+from strategies.monte_carlo import MAX_PATH_BARS, run_monte_carlo
+from strategies.strategy_manager import strategy_manager
+
+
+@pytest.fixture(scope="module")
+def data():
+    return synthetic_history("AAPL", "2015-01-01", "2020-01-01")
+
+
+def test_process_pool_is_reused_and_matches_in_process_runs(data):
+    strategy = strategy_manager.create_strategy("rsi_strategy")
+    in_process = run_monte_carlo(strategy, data, n_paths=600, n_jobs=1)
+    first = run_monte_carlo(strategy, data, n_paths=600, n_jobs=2)
+    pool = monte_carlo._pool
+    second = run_monte_carlo(strategy, data, n_paths=600, n_jobs=2)
+    assert monte_carlo._pool is pool
+    assert first == second == in_process
+
+
+def test_path_length_is_capped(data):
+    strategy = strategy_manager.create_strategy("rsi_strategy")
+    with pytest.raises(ValueError, match="limited"):
+        run_monte_carlo(strategy, data, n_paths=1, n_bars=MAX_PATH_BARS + 1, n_jobs=1)
+
+
+@pytest.mark.parametrize("n_paths, n_bars", [(10, 5_000_000), (20000, 10000)])
+def test_robustness_endpoint_rejects_oversized_runs(monkeypatch, data, n_paths, n_bars):
+    monkeypatch.setattr(main.stock_data_service, "get_stock_data", lambda *args: data)
+    client = TestClient(main.app)
+    response = client.post("/robustness", json={
+        "symbol": "AAPL", "start_date": "2015-01-01", "end_date": "2020-01-01",
+        "strategy": {"strategy_id": "rsi_strategy"}, "n_paths": n_paths, "n_bars": n_bars
+    })
+    assert response.status_code == 400
+    assert "limited" in response.json()["detail"]
+
+
+class SignalsOnly(BaseStrategy):
+    """Wraps a strategy but only exposes generate_signals, not signal_conditions"""
+
+    def __init__(self, strategy):
+        super().__init__(strategy.name, strategy.description)
+        self.strategy = strategy
+
+    def generate_signals(self, data):
+        return self.strategy.generate_signals(data)
+
+
+@pytest.mark.parametrize("strategy_id", ["moving_average_crossover", "rsi_strategy", "bollinger_bands_strategy"])
+def test_batch_signals_match_with_and_without_vectorized_conditions(data, strategy_id):
+    strategy = strategy_manager.create_strategy(strategy_id)
+    wrapped = SignalsOnly(strategy)
+    assert wrapped.signal_conditions(data) is None
+    closes = pd.DataFrame({path: data["Close"].to_numpy() * (1 + 0.01 * path) for path in range(4)}, index=data.index)
+    np.testing.assert_array_equal(strategy.generate_signals_batch(closes), wrapped.generate_signals_batch(closes))
@@ -0,0 +1,71 @@
+"""BacktestReport serialization and the summary-only /backtest response"""
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from backend import main
+from backend.services.offline_data import synthetic_history
+from strategies.base.results import BacktestReport, TRADE_DTYPE
+from strategies.strategy_manager import strategy_manager
+
+
+@pytest.fixture(scope="module")
+def data():
+    return synthetic_history("AAPL", "2015-01-01", "2020-01-01")
+
+
+@pytest.mark.parametrize("strategy_id", ["moving_average_crossover", "rsi_strategy", "macd_strategy"])
+def test_summary_only_report_matches_the_full_one(data, strategy_id):
+    full = strategy_manager.run_backtest(strategy_id, data)
+    summary_only = strategy_manager.run_backtest(strategy_id, data, include_series=False)
+    assert full.has_series and not summary_only.has_series
+
+    full_dict = full.to_dict()
+    summary_dict = summary_only.to_dict()
+    assert len(full_dict['portfolio_values']) == len(full_dict['dates']) == len(data)
+    assert 'portfolio_values' not in summary_dict and 'dates' not in summary_dict
+    assert summary_dict == {key: value for key, value in full_dict.items() if key not in ('portfolio_values', 'dates')}
+    assert summary_only.summary() == full.summary()
+    assert summary_dict['trades'] == full.trade_records() and summary_dict['trades']
+    # Metrics in the dict are exactly summary(); the result is strict JSON
+    assert {key: summary_dict[key] for key in full.summary()} == full.summary()
+    json.dumps(full_dict, allow_nan=False)
+
+
+def test_report_records():
+    index = pd.date_range("2024-01-02 09:30", periods=4, freq="h", tz="America/New_York")
+    trades = np.array([(0, 1, 10.0, 100.0, 1000.0), (3, -1, 12.0, 0.0, 1200.0)], dtype=TRADE_DTYPE)
+    metrics = {'total_return': 20.0, 'sharpe_ratio': np.nan, 'total_trades': np.int64(1)}
+    report = BacktestReport("Test", metrics, trades, index, equity=np.array([1000.0, 1100.0, 1050.0, 1200.0]))
+
+    assert report['total_return'] == 20.0 and report['strategy_name'] == "Test"
+    assert report.summary() == {'total_return': 20.0, 'sharpe_ratio': None, 'total_trades': 1}
+    assert report.trade_records() == [
+        {'date': '2024-01-02 09:30', 'action': 'BUY', 'price': 10.0, 'shares': 100.0, 'capital': 1000.0},
+        {'date': '2024-01-02 12:30', 'action': 'SELL', 'price': 12.0, 'shares': 0.0, 'capital': 1200.0},
+    ]
+    assert report.to_dict(include_series=False) == {'strategy_name': "Test", **report.summary(),
+                                                     'trades': report.trade_records()}
+    assert report.to_dict()['portfolio_values'] == [1000.0, 1100.0, 1050.0, 1200.0]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main.stock_data_service, "get_stock_data",
+                        lambda symbol, start_date, end_date: synthetic_history(symbol, start_date, end_date))
+    monkeypatch.setattr(main.settings, "BACKTEST_CACHE_TTL", 0)
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_summary_only_endpoint_returns_no_series(client):
+    params = {"symbol": "AAPL", "strategy_id": "moving_average_crossover",
+              "start_date": "2015-01-01", "end_date": "2020-01-01"}
+    full = client.get("/backtest", params=params).json()["results"]
+    summary = client.get("/backtest", params={**params, "summary_only": "true"}).json()["results"]
+
+    assert {'portfolio_values', 'dates', 'chart'} <= set(full)
+    assert not {'portfolio_values', 'dates', 'chart'} & set(summary)
+    assert summary == {key: value for key, value in full.items() if key not in ('portfolio_values', 'dates', 'chart')}
+    assert summary['trades']
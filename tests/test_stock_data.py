@@ -0,0 +1,52 @@
+"""Bulk downloads and single-symbol history share the cache without mixing frames"""
+import numpy as np
+import pandas as pd
+import pytest
+from backend.services import stock_data as stock_data_module
+from backend.services.offline_data import synthetic_history
+from backend.services.shared_cache import SharedCache
+from backend.services.stock_data import StockDataService
+from backend.services.upstream import Upstream, build_session
+from strategies.strategy_manager import strategy_manager
+
+
+@pytest.fixture
+def service(tmp_path):
+    upstream = Upstream("Fake", session=build_session(prefer_curl_cffi=False), sleep=lambda seconds: None)
+    return StockDataService(upstream=upstream, cache=SharedCache(str(tmp_path / "cache.db")), offline=False)
+
+
+def test_bulk_download_does_not_replace_history(service, monkeypatch):
+    history = synthetic_history("AAPL", "2020-01-01", "2021-01-01")
+    # yf.download with its defaults: naive dates and no dividend/split columns
+    downloaded = history[["Open", "High", "Low", "Close", "Volume"]].tz_localize(None)
+    monkeypatch.setattr(stock_data_module.yf, "download", lambda *args, **kwargs: downloaded)
+    fetches = []
+
+    def fetch_history(symbol, start_date, end_date):
+        fetches.append(symbol)
+        return history
+
+    service._fetch_history = fetch_history
+
+    bulk = service.get_bulk_stock_data(["AAPL"], "2020-01-01", "2021-01-01")
+    assert bulk["AAPL"].index.tz is None
+    single = service.get_stock_data("AAPL", "2020-01-01", "2021-01-01")
+    assert fetches == ["AAPL"]
+    pd.testing.assert_frame_equal(single, history)
+
+    # Once fetched, the history frame also serves bulk requests
+    bulk = service.get_bulk_stock_data(["AAPL"], "2020-01-01", "2021-01-01")
+    pd.testing.assert_frame_equal(bulk["AAPL"], history)
+
+
+def test_naive_checkpoint_extends_with_aware_bars():
+    data = synthetic_history("MSFT", "2018-01-01", "2021-01-01")
+    strategy = strategy_manager.create_strategy("rsi_strategy")
+    split = len(data) - 50
+    naive = data.iloc[:split].tz_localize(None)
+    report = strategy.backtest(naive)
+    extended = strategy.extend_backtest(report.state, data.iloc[split - 5:])
+    full = strategy.backtest(data)
+    assert extended.state.n_bars == len(data)
+    assert np.isclose(extended["total_return"], full["total_return"])
@@ -0,0 +1,223 @@
+"""
+Upstream call stack (retries, rate limit, circuit breaker) and the stale-cache
+fallback of StockDataService, exercised against a local fake HTTP server
+"""
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pandas as pd
+import pytest
+import requests
+from yfinance.exceptions import YFInvalidPeriodError, YFPricesMissingError, YFTzMissingError
+from backend.main import error_status
+from backend.services.shared_cache import SharedCache
+from backend.services.stock_data import StockDataService
+from backend.services.upstream import (
+    CircuitBreaker, RetryPolicy, TokenBucket, Upstream, UpstreamError, UpstreamUnavailableError, build_session
+)
+
+
+class FakeServer:
+    """HTTP server answering with a scripted list of status codes (then 200s)"""
+
+    def __init__(self):
+        self.statuses = []
+        self.hits = 0
+        self.body = {"Close": [1.0, 2.0, 3.0]}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.hits += 1
+                status = server.statuses.pop(0) if server.statuses else 200
+                payload = json.dumps(server.body if status == 200 else {"error": status}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/history"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def server():
+    server = FakeServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def sleeps():
+    return []
+
+
+@pytest.fixture
+def upstream(clock, sleeps):
+    return Upstream(
+        "Fake",
+        session=build_session(prefer_curl_cffi=False),
+        rate_limiter=TokenBucket(rate=1000, capacity=1000),
+        retry=RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=8, rng=random.Random(0)),
+        breaker=CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock),
+        timeout=5,
+        sleep=sleeps.append
+    )
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503])
+def test_transient_errors_are_retried(server, upstream, sleeps, status):
+    server.statuses = [status, status]
+    response = upstream.get(server.url)
+    assert response.json() == server.body
+    assert server.hits == 3
+    assert len(sleeps) == 2
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_backoff_grows_and_is_capped(server, upstream, sleeps):
+    server.statuses = [503] * 3
+    with pytest.raises(UpstreamError):
+        upstream.get(server.url)
+    assert server.hits == 3
+    assert 0 <= sleeps[0] <= 0.5 and 0 <= sleeps[1] <= 1.0
+
+
+@pytest.mark.parametrize("status", [400, 404])
+def test_client_errors_are_not_retried(server, upstream, sleeps, status):
+    server.statuses = [status]
+    with pytest.raises(requests.HTTPError):
+        upstream.get(server.url)
+    assert server.hits == 1
+    assert sleeps == []
+    assert upstream.breaker.failures == 0
+
+
+@pytest.mark.parametrize("error", [
+    YFTzMissingError("NOPE"),
+    YFPricesMissingError("NOPE", ""),
+    YFInvalidPeriodError("NOPE", "7y", "1d, 5d"),
+])
+def test_unknown_symbols_are_not_retried(upstream, sleeps, error):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        raise error
+
+    for _ in range(upstream.breaker.failure_threshold + 1):
+        with pytest.raises(type(error)):
+            upstream.call(fetch)
+    assert len(calls) == upstream.breaker.failure_threshold + 1
+    assert sleeps == []
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_opens_then_half_opens(server, upstream, clock):
+    server.statuses = [500] * 6
+    for _ in range(2):
+        with pytest.raises(UpstreamError):
+            upstream.get(server.url)
+    assert upstream.breaker.state == CircuitBreaker.OPEN
+
+    # While open, calls fail fast without reaching the server
+    hits = server.hits
+    with pytest.raises(UpstreamUnavailableError):
+        upstream.get(server.url)
+    assert server.hits == hits
+
+    # After the reset timeout one trial call goes through; its failure reopens the circuit
+    clock.now += 30
+    assert upstream.breaker.state == CircuitBreaker.HALF_OPEN
+    server.statuses = [500] * 3
+    with pytest.raises(UpstreamError):
+        upstream.get(server.url)
+    assert upstream.breaker.state == CircuitBreaker.OPEN
+
+    # A successful trial closes it
+    clock.now += 30
+    server.statuses = []
+    assert upstream.get(server.url).ok
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_rate_limiter_waits_for_tokens(clock, sleeps):
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock.now += seconds
+
+    bucket = TokenBucket(rate=2, capacity=1, clock=clock, sleep=sleep)
+    assert bucket.acquire()
+    assert bucket.acquire()
+    assert sleeps == [0.5]
+    assert not bucket.try_acquire()
+
+
+@pytest.fixture
+def service(server, upstream, tmp_path):
+    service = StockDataService(upstream=upstream, cache=SharedCache(str(tmp_path / "cache.db")), offline=False)
+
+    def fetch_history(symbol, start_date, end_date):
+        response = upstream.session.get(server.url, params={"symbol": symbol}, timeout=upstream.timeout)
+        response.raise_for_status()
+        return pd.DataFrame(response.json())
+
+    service._fetch_history = fetch_history
+    return service
+
+
+def test_stale_cache_serves_when_upstream_fails(server, service):
+    # TTL 0: every request goes upstream, the response is only kept as a fallback
+    service.ttl = 0
+    fresh = service.get_stock_data("AAPL", "2020-01-01", "2021-01-01")
+    server.statuses = [503] * 3
+    stale = service.get_stock_data("AAPL", "2020-01-01", "2021-01-01")
+    pd.testing.assert_frame_equal(stale, fresh)
+    assert server.hits == 4
+
+
+def test_upstream_failure_without_cache_is_503(server, service):
+    server.statuses = [503] * 3
+    with pytest.raises(UpstreamError) as error:
+        service.get_stock_data("MSFT", "2020-01-01", "2021-01-01")
+    assert error_status(error.value) == 503
+
+
+def test_unknown_symbol_is_400_and_keeps_circuit_closed(service):
+    calls = []
+
+    def fetch_history(symbol, start_date, end_date):
+        calls.append(symbol)
+        raise YFTzMissingError(symbol)
+
+    service._fetch_history = fetch_history
+    for _ in range(service.upstream.breaker.failure_threshold + 1):
+        with pytest.raises(Exception) as error:
+            service.get_stock_data("NOPE", "2020-01-01", "2021-01-01")
+        assert error_status(error.value) == 400
+    assert len(calls) == service.upstream.breaker.failure_threshold + 1
+    assert service.upstream.breaker.state == CircuitBreaker.CLOSED